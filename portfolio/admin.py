@@ -1,6 +1,6 @@
 from django.contrib import admin
 from .models import Profile, Project, Experience, Skill, BlogPost
-from .models import KnowledgeDocument, ChatLog
+from .models import KnowledgeDocument, KnowledgeGeneration, ChatLog
 
 @admin.register(Profile)
 class ProfileAdmin(admin.ModelAdmin):
@@ -33,8 +33,14 @@ class BlogPostAdmin(admin.ModelAdmin):
 
 @admin.register(KnowledgeDocument)
 class KnowledgeDocumentAdmin(admin.ModelAdmin):
-    list_display = ("source", "title", "updated_at")
-    search_fields = ("source", "title", "content")
+    list_display = ("source", "title", "generation", "updated_at")
+    list_filter = ("generation",)
+    search_fields = ("source", "title", "blob__text")
+    raw_id_fields = ("blob",)
+
+@admin.register(KnowledgeGeneration)
+class KnowledgeGenerationAdmin(admin.ModelAdmin):
+    list_display = ("id", "label", "building", "created_at", "activated_at")
 
 @admin.register(ChatLog)
 class ChatLogAdmin(admin.ModelAdmin):
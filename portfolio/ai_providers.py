@@ -31,8 +31,9 @@ def build_system_prompt(vars: Dict[str, Any] | None = None) -> str:
     return render_system_prompt(vars or {})
 
 
-def _truncate_context(text: str, limit: int = 4000) -> str:
-    return text[:limit]
+def _truncate_context(text: str, limit: Optional[int] = None) -> str:
+    # Same budget the knowledge packer fills, so packed context normally arrives whole
+    return text[:limit or getattr(settings, "KNOWLEDGE_CONTEXT_BUDGET", 4000)]
 
 
 def _try_parse_json(text: str) -> Optional[Dict[str, Any]]:
@@ -6,6 +6,9 @@ class PortfolioConfig(AppConfig):
     name = "portfolio"
 
     def ready(self):  # pragma: no cover - side-effect setup
+        # Incremental knowledge sync on content edits
+        from . import signals  # noqa: F401
+
         # Wire a post_migrate hook to create the daily beat schedule once DB is ready
         try:
             from django.db.models.signals import post_migrate
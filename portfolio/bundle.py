@@ -0,0 +1,71 @@
+"""Homepage bundle: profile, skills, projects, experiences, featured posts and series in one payload.
+
+The bundle is rendered once to JSON bytes and cached for BUNDLE_CACHE_TIMEOUT (a day by
+default, so calendar-derived fields such as duration_months and years_used move on), so
+serving the homepage is a single cache read with no queries or serializer work. Edits to any
+model it contains drop the cached copy after commit and schedule a rebuild (see
+portfolio.signals).
+"""
+from django.conf import settings
+from django.core.cache import cache
+from django.utils import timezone
+
+from .renderers import dumps
+
+BUNDLE_CACHE_KEY = "portfolio_bundle:json"
+BUNDLE_REBUILD_KEY = "portfolio_bundle:rebuild"
+
+
+def build_bundle() -> bytes:
+    from .serializers import (
+        BlogPostListSerializer,
+        BlogSeriesSerializer,
+        ExperienceSerializer,
+        ProfileSerializer,
+        ProjectSerializer,
+        SkillSerializer,
+    )
+    from .views import BLOG_LIST_DEFERRED, ExperienceViewSet, ProfileViewSet, ProjectViewSet, SkillViewSet
+    from .models import BlogPost, BlogSeries
+
+    # Same query plans as the list endpoints (see the viewsets)
+    profile = ProfileViewSet.queryset.first()
+    posts = (
+        BlogPost.objects.filter(status="published", featured=True)
+        .select_related("series")
+        .defer(*BLOG_LIST_DEFERRED)
+        .order_by("pinned_order", "-published_at")[: getattr(settings, "BUNDLE_FEATURED_POSTS", 6)]
+    )
+    data = {
+        "profile": ProfileSerializer(profile).data if profile else None,
+        "skills": SkillSerializer(SkillViewSet.queryset.all(), many=True).data,
+        "projects": ProjectSerializer(ProjectViewSet.queryset.all(), many=True).data,
+        "experiences": ExperienceSerializer(ExperienceViewSet.queryset.all(), many=True).data,
+        "featured_posts": BlogPostListSerializer(posts, many=True).data,
+        "series": BlogSeriesSerializer(BlogSeries.objects.filter(published=True), many=True).data,
+        "built_at": timezone.now().isoformat(),
+    }
+    return dumps(data)
+
+
+def _timeout() -> int:
+    return getattr(settings, "BUNDLE_CACHE_TIMEOUT", 24 * 60 * 60)
+
+
+def get_bundle():
+    """(JSON bytes, cache hit) — built and stored on a miss."""
+    payload = cache.get(BUNDLE_CACHE_KEY)
+    if payload is not None:
+        return payload, True
+    payload = build_bundle()
+    # An edit committed while we were reading may be missing from this payload; a pending
+    # rebuild means one was, so leave storing to the rebuild task
+    if not cache.get(BUNDLE_REBUILD_KEY):
+        cache.set(BUNDLE_CACHE_KEY, payload, timeout=_timeout())
+    return payload, False
+
+
+def rebuild_bundle() -> int:
+    payload = build_bundle()
+    cache.set(BUNDLE_CACHE_KEY, payload, timeout=_timeout())
+    return len(payload)
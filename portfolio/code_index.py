@@ -0,0 +1,141 @@
+"""Code-aware tokenization and the symbol index used for exact lookups.
+
+Ingested code bodies are scanned for definitions (functions, classes, methods, ...) and
+their file paths; both are stored lowercased in KnowledgeSymbol, keyed by blob. Identical
+files share a blob, so path hits are checked against each document's own source. A question
+naming `get_project_count`, `SupabaseMediaStorage._save` or `portfolio/storage.py` is then
+answered by an indexed equality lookup before any full-text ranking.
+"""
+import re
+from typing import Dict, Iterable, List, Set, Tuple
+
+from django.db.models import Q, QuerySet
+
+from .models import KnowledgeDocument, KnowledgeSymbol
+
+CODE_PREFIX = "github_code:"
+# Identifiers, optionally dotted (module.Class.method) or path-like (dir/file.ext)
+IDENTIFIER_RE = re.compile(r"[A-Za-z_$][\w$]*(?:[./][A-Za-z_$][\w$-]*)*")
+CAMEL_RE = re.compile(r"[A-Z]+(?=[A-Z][a-z0-9])|[A-Z]?[a-z0-9]+|[A-Z]+|\d+")
+# Definition keywords across the languages ingestion accepts (see ingest.INCLUDE_EXT)
+DEFINITION_RE = re.compile(
+    r"^(?P<indent>[ \t]*)(?:export\s+)?(?:default\s+)?(?:pub(?:\([^)]*\))?\s+)?(?:async\s+)?(?:static\s+)?"
+    r"(?:def|class|function\*?|func|fn|struct|interface|enum|trait|type|module|impl|object)\s+"
+    r"(?:\([^)]*\)\s*)?(?P<name>[A-Za-z_$][\w$]*)",
+    re.MULTILINE,
+)
+# Top-level `NAME = ...` / `const name = (...) =>` style definitions
+ASSIGNMENT_RE = re.compile(
+    r"^(?:export\s+)?(?:(?:const|let|var)\s+)?(?P<name>[A-Za-z_$][\w$]*)\s*=(?!=)", re.MULTILINE
+)
+MAX_SYMBOL_LENGTH = 200
+
+
+def split_identifier(name: str) -> List[str]:
+    """Lowercased parts of an identifier: snake_case, camelCase, dotted and path separators."""
+    parts: List[str] = []
+    for chunk in re.split(r"[^A-Za-z0-9]+", name):
+        parts.extend(p.lower() for p in CAMEL_RE.findall(chunk))
+    return parts
+
+
+def code_tokens(text: str) -> List[str]:
+    """Search terms for a question: whole identifiers and paths first, then their parts."""
+    tokens: List[str] = []
+    for match in IDENTIFIER_RE.findall(text or ""):
+        whole = match.strip("./").lower()
+        for token in [whole, *whole.split("/"), *whole.split("."), *split_identifier(match)]:
+            if token and token not in tokens:
+                tokens.append(token)
+    return tokens
+
+
+def symbol_candidates(text: str) -> Set[str]:
+    """Strings in a question that could be an exact symbol or path key (lowercased)."""
+    candidates: Set[str] = set()
+    for match in IDENTIFIER_RE.findall(text or ""):
+        match = match.strip("./")
+        # Dotted references also name their parts (`views.ChatAskView` -> `ChatAskView`)
+        for token in {match, *match.split(".")}:
+            # Plain lowercase words ("show", "function") are not useful symbol keys
+            if len(token) > 2 and (token != token.lower() or any(c in token for c in "_./$")):
+                candidates.add(token.lower())
+    # Backticked names are symbols whatever their case
+    for quoted in re.findall(r"`([^`]+)`", text or ""):
+        candidates.add(quoted.strip().strip("()").lower())
+    return candidates
+
+
+def path_keys(path: str) -> List[str]:
+    """Every trailing sub-path of a file path, so `storage.py` and `portfolio/storage.py` both hit."""
+    segments = [s for s in path.lower().split("/") if s]
+    return ["/".join(segments[i:]) for i in range(len(segments))]
+
+
+def extract_definitions(text: str) -> Set[str]:
+    """Defined names in a code body, plus `Class.method` for methods of Python-style classes."""
+    names: Set[str] = set()
+    classes: List[Tuple[int, str]] = []  # (indent, name) of enclosing classes
+    for match in DEFINITION_RE.finditer(text or ""):
+        indent = len(match.group("indent").expandtabs(4))
+        name = match.group("name")
+        while classes and classes[-1][0] >= indent:
+            classes.pop()
+        names.add(name)
+        if classes:
+            names.add(f"{classes[-1][1]}.{name}")
+        if match.group(0).lstrip().split(None, 1)[0] == "class":
+            classes.append((indent, name))
+    for match in ASSIGNMENT_RE.finditer(text or ""):
+        names.add(match.group("name"))
+    return {n.lower() for n in names if len(n) > 1}
+
+
+def symbol_rows(docs: Iterable[Tuple[str, str, str]], new_hashes: Set[str]) -> List[KnowledgeSymbol]:
+    """Symbol rows for `(source, blob hash, body)` code documents; definitions only for new bodies."""
+    rows: Dict[Tuple[str, str, str], KnowledgeSymbol] = {}
+    for source, digest, body in docs:
+        if not source.startswith(CODE_PREFIX):
+            continue
+        path = source[len(CODE_PREFIX):].partition(":")[2]
+        keys = [(key, KnowledgeSymbol.PATH) for key in path_keys(path)]
+        if digest in new_hashes:
+            keys += [(name, KnowledgeSymbol.DEFINITION) for name in extract_definitions(body)]
+        for name, kind in keys:
+            if len(name) <= MAX_SYMBOL_LENGTH:
+                rows.setdefault((digest, name, kind), KnowledgeSymbol(blob_id=digest, name=name, kind=kind))
+    return list(rows.values())
+
+
+def lookup_symbols(docs: QuerySet, text: str, limit: int = 50) -> List[KnowledgeDocument]:
+    """Documents of `docs` whose body defines, or whose path is, a name given in the question."""
+    candidates = symbol_candidates(text)
+    if not candidates:
+        return []
+    hits = KnowledgeSymbol.objects.filter(name__in=candidates)
+    match = Q(blob_id__in=hits.filter(kind=KnowledgeSymbol.DEFINITION).values("blob_id"))
+    paths = set(hits.filter(kind=KnowledgeSymbol.PATH).values_list("name", flat=True))
+    if paths:
+        # The blob's path rows come from every file with that body (an empty __init__.py, a
+        # LICENSE): keep only documents whose own path ends with the key
+        own_path = Q(pk__in=[])
+        for key in paths:
+            own_path |= Q(source__iendswith=f":{key}") | Q(source__iendswith=f"/{key}")
+        match |= Q(blob_id__in=hits.filter(kind=KnowledgeSymbol.PATH).values("blob_id")) & own_path
+    return list(docs.filter(match).order_by("-updated_at")[:limit])
+
+
+def rebuild_symbols(batch_size: int = 500) -> int:
+    """Re-derive the whole symbol table from stored code documents."""
+    KnowledgeSymbol.objects.all().delete()
+    created, seen, batch = 0, set(), []
+    code_docs = KnowledgeDocument.objects.filter(source_type="github_code").select_related("blob")
+    for doc in code_docs.iterator(chunk_size=batch_size):
+        new = {doc.blob_id} - seen
+        seen.add(doc.blob_id)
+        batch.extend(symbol_rows([(doc.source, doc.blob_id, doc.blob.content)], new))
+        if len(batch) >= batch_size:
+            KnowledgeSymbol.objects.bulk_create(batch, ignore_conflicts=True)
+            created, batch = created + len(batch), []
+    KnowledgeSymbol.objects.bulk_create(batch, ignore_conflicts=True)
+    return created + len(batch)
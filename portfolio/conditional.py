@@ -0,0 +1,110 @@
+"""Conditional GET: ETag / Last-Modified validators and 304 short-circuits.
+
+ETags are derived from content versions that live in the cache (the per-model representation
+versions, the knowledge generation revision, the bundle bytes), so a matching
+`If-None-Match` is answered before any serialization and, for the viewsets, before any
+query. Retrieve responses of models with an `updated_at` column also send `Last-Modified`;
+lists don't, since a deletion or a row leaving the filter doesn't move the newest stamp.
+"""
+import datetime
+import hashlib
+
+from django.db.models import Max
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+
+from .representations import representation_version
+
+
+def make_etag(*parts) -> str:
+    return '"%s"' % hashlib.sha1("|".join(str(p) for p in parts).encode("utf-8")).hexdigest()[:32]
+
+
+def request_fingerprint(request) -> str:
+    """What else shapes a response: host (absolute links), sorted query and negotiated format."""
+    accepted = getattr(request, "accepted_renderer", None)
+    query = sorted(request.query_params.lists()) if hasattr(request, "query_params") else sorted(request.GET.lists())
+    return f"{request.get_host()}|{query}|{getattr(accepted, 'format', '')}"
+
+
+def not_modified(request, etag=None, last_modified=None):
+    """The 304 (or 412) response when the request's validators match, else None."""
+    timestamp = int(last_modified.timestamp()) if last_modified else None
+    response = get_conditional_response(request, etag=etag, last_modified=timestamp)
+    if response is not None and response.status_code == 304:
+        set_validators(response, etag=etag, last_modified=last_modified)
+    return response
+
+
+def set_validators(response, etag=None, last_modified=None):
+    if 200 <= response.status_code < 300 or response.status_code == 304:
+        if etag:
+            response["ETag"] = etag
+        if last_modified:
+            response["Last-Modified"] = http_date(last_modified.timestamp())
+    return response
+
+
+class ConditionalGetMixin:
+    """ETag (and Last-Modified via `last_modified_field`) on viewset list and retrieve.
+
+    The ETag combines the model's representation version (bumped by signals on writes to it
+    or to anything its representation embeds) with the request fingerprint, and the day for
+    serializers whose output follows the calendar (`varies_by_date`). The version is
+    read before any row and handed to the serializers, so rows are cached under it.
+    Actions outside `conditional_actions` are served without validators.
+    """
+
+    last_modified_field = None
+    conditional_actions = ("list", "retrieve")
+
+    def content_etag(self, request, **kwargs):
+        # Memoized per request (views are instantiated per request); also the response cache key
+        if getattr(self, "_content_etag", None) is None:
+            model = self.get_queryset().model
+            self._representation_versions = {model: representation_version(model)}
+            today = datetime.date.today() if getattr(self.get_serializer_class(), "varies_by_date", False) else ""
+            self._content_etag = make_etag(
+                model._meta.label_lower, self._representation_versions[model], self.action, kwargs,
+                request_fingerprint(request), today,
+            )
+        return self._content_etag
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        if getattr(self, "_representation_versions", None):
+            context["representation_versions"] = self._representation_versions
+        return context
+
+    def content_last_modified(self, **kwargs):
+        # Single objects only: a list's newest stamp survives deletions and filter changes
+        lookup = kwargs.get(self.lookup_url_kwarg or self.lookup_field)
+        if not self.last_modified_field or lookup is None:
+            return None
+        qs = self.filter_queryset(self.get_queryset()).filter(**{self.lookup_field: lookup})
+        return qs.aggregate(latest=Max(self.last_modified_field))["latest"]
+
+    def _conditional(self, request, kwargs, respond):
+        if self.action not in self.conditional_actions:
+            return respond()
+        etag = self.content_etag(request, **kwargs)
+        # If-None-Match wins over If-Modified-Since, so the DB is only asked when it can matter
+        last_modified = None
+        if "HTTP_IF_MODIFIED_SINCE" in request.META and "HTTP_IF_NONE_MATCH" not in request.META:
+            last_modified = self.content_last_modified(**kwargs)
+        cached = not_modified(request, etag=etag, last_modified=last_modified)
+        if cached is not None:
+            return cached
+        response = respond()
+        # Responses replayed from the response cache carry their validators already
+        if last_modified is None and not response.has_header("Last-Modified"):
+            last_modified = self.content_last_modified(**kwargs)
+        return set_validators(response, etag=etag, last_modified=last_modified)
+
+    def list(self, request, *args, **kwargs):
+        return self._conditional(request, kwargs, lambda: super(ConditionalGetMixin, self).list(request, *args, **kwargs))
+
+    def retrieve(self, request, *args, **kwargs):
+        return self._conditional(
+            request, kwargs, lambda: super(ConditionalGetMixin, self).retrieve(request, *args, **kwargs)
+        )
@@ -0,0 +1,124 @@
+"""Cheap checks that keep binary, generated and vendored files out of the knowledge base.
+
+Checks run in order of cost: path/size rules from the git tree listing (no download),
+then a small leading sample of the blob (NUL bytes, line-length/minification heuristics),
+so junk is rejected before it is read in full.
+"""
+import posixpath
+from fnmatch import fnmatchcase
+from typing import Dict, List, Optional, Tuple
+
+from django.conf import settings
+
+# Dependency lockfiles and similar machine-written manifests
+GENERATED_NAMES = {
+    "package-lock.json", "npm-shrinkwrap.json", "yarn.lock", "pnpm-lock.yaml", "composer.lock",
+    "Pipfile.lock", "poetry.lock", "Cargo.lock", "Gemfile.lock", "go.sum", "bun.lockb",
+}
+GENERATED_SUFFIXES = (
+    ".min.js", ".min.css", "-min.js", ".bundle.js", ".chunk.js", ".map", ".pb.go", "_pb2.py", ".designer.cs",
+)
+VENDOR_DIRS = {"vendor", "third_party", "third-party", "bower_components"}
+
+LINGUIST_ATTRS = ("linguist-generated", "linguist-vendored")
+
+
+def max_blob_bytes() -> int:
+    return getattr(settings, "KNOWLEDGE_INGEST_MAX_BLOB_BYTES", 256 * 1024)
+
+
+def sample_bytes() -> int:
+    return getattr(settings, "KNOWLEDGE_INGEST_SAMPLE_BYTES", 8 * 1024)
+
+
+class GitAttributes:
+    """The linguist-generated/linguist-vendored subset of one or more .gitattributes files."""
+
+    def __init__(self):
+        # (base_dir, pattern, {attr: bool}) in file order; later lines win
+        self.rules: List[Tuple[str, str, Dict[str, bool]]] = []
+
+    def add(self, text: str, base_dir: str = "") -> None:
+        for line in text.splitlines():
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            parts = line.split()
+            pattern, attrs = parts[0], {}
+            for token in parts[1:]:
+                name, _, value = token.partition("=")
+                state = True
+                if name.startswith(("-", "!")):
+                    name, state = name[1:], False
+                elif value:
+                    state = value.lower() not in {"false", "0"}
+                if name in LINGUIST_ATTRS:
+                    attrs[name] = state
+            if attrs:
+                self.rules.append((base_dir.strip("/"), pattern, attrs))
+
+    @staticmethod
+    def _matches(pattern: str, path: str) -> bool:
+        if pattern.endswith("/**"):
+            prefix = pattern[:-3].lstrip("/")
+            return path == prefix or path.startswith(prefix + "/")
+        if "/" not in pattern.rstrip("/"):
+            # No slash: match the name at any depth (directory names included)
+            name = pattern.rstrip("/")
+            return any(fnmatchcase(seg, name) for seg in path.split("/"))
+        return fnmatchcase(path, pattern.lstrip("/").replace("**/", "*"))
+
+    def lookup(self, path: str) -> Dict[str, bool]:
+        found: Dict[str, bool] = {}
+        for base, pattern, attrs in self.rules:
+            rel = path
+            if base:
+                if not path.startswith(base + "/"):
+                    continue
+                rel = path[len(base) + 1:]
+            if self._matches(pattern, rel):
+                found.update(attrs)
+        return found
+
+
+def classify_path(path: str, size: Optional[int] = None, attributes: Optional[GitAttributes] = None) -> Optional[str]:
+    """Reason to reject a file from its tree entry alone, or None to keep it."""
+    name = posixpath.basename(path)
+    if size is not None and size > max_blob_bytes():
+        return "too_large"
+    if attributes is not None:
+        attrs = attributes.lookup(path)
+        if attrs.get("linguist-generated"):
+            return "generated"
+        if attrs.get("linguist-vendored"):
+            return "vendored"
+        # An explicit `-linguist-generated` / `-linguist-vendored` overrides the built-in guesses
+        if attrs.get("linguist-generated") is False or attrs.get("linguist-vendored") is False:
+            return None
+    if name in GENERATED_NAMES or name.lower().endswith(GENERATED_SUFFIXES):
+        return "generated"
+    if any(seg in VENDOR_DIRS for seg in path.split("/")[:-1]):
+        return "vendored"
+    return None
+
+
+def classify_sample(sample: bytes) -> Optional[str]:
+    """Reason to reject a file from its first bytes, or None to keep it."""
+    if not sample:
+        return None
+    if b"\0" in sample:
+        return "binary"
+    text = sample.decode("utf-8", errors="ignore")
+    lines = text.splitlines() or [text]
+    # The last line of a sample is usually cut; don't let it skew short files
+    if len(lines) > 1 and not text.endswith("\n"):
+        lines = lines[:-1]
+    avg_line = sum(len(ln) for ln in lines) / len(lines)
+    if avg_line > getattr(settings, "KNOWLEDGE_INGEST_MAX_AVG_LINE", 200):
+        return "minified"
+    # Minified bundles: very long lines with almost no indentation/whitespace
+    if len(text) >= 2048 and max(len(ln) for ln in lines) > 1000:
+        ws = sum(1 for ch in text if ch in " \t")
+        if ws / len(text) < 0.05:
+            return "minified"
+    return None
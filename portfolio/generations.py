@@ -0,0 +1,240 @@
+"""Blue/green knowledge generations: build next to the live set, flip with one update, roll back.
+
+Readers only ever see `KnowledgeDocument.objects.active()`. A rebuild or code ingest writes
+into a new, still-`building` generation (seeded with copies of the live rows, which are
+cheap because bodies are shared blobs), so the live generation is never locked or half
+written. `activate_generation` stamps `activated_at` and the newest stamp wins; the previous
+generations are kept for `rollback_generation` until `collect_generations` removes them.
+
+Builds overlap (a nightly refresh next to a long code ingest), so each build records the
+source prefixes it owns. Activation runs under a lock and first rebases the build: rows
+outside its scope are replaced with those of the generation live at that moment, so one
+build never throws away what another activated in the meantime.
+"""
+import time
+from contextlib import contextmanager
+from datetime import timedelta
+from typing import Iterable, List, Optional
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Min, OuterRef, Q, Subquery
+from django.utils import timezone
+
+from .models import KnowledgeDocument, KnowledgeGeneration
+
+ACTIVE_CACHE_KEY = "knowledge_generation:active"
+# Other processes pick up a flip within this many seconds (the flipping process sees it at once)
+ACTIVE_CACHE_SECONDS = 30
+ACTIVATE_LOCK_KEY = "knowledge_generation:activate_lock"
+ACTIVATE_LOCK_SECONDS = 10 * 60
+
+
+class GenerationBusy(Exception):
+    """Another activation held the lock for longer than we were willing to wait."""
+
+
+def _live_generation_id() -> Optional[int]:
+    return (
+        KnowledgeGeneration.objects.filter(activated_at__isnull=False)
+        .order_by("-activated_at", "-id")
+        .values_list("id", flat=True)
+        .first()
+    )
+
+
+def active_generation_id() -> int:
+    generation_id = cache.get(ACTIVE_CACHE_KEY)
+    if generation_id is None:
+        generation_id = _live_generation_id()
+        if generation_id is None:
+            # Fresh database: start with an empty live generation
+            generation_id = KnowledgeGeneration.objects.create(
+                label="initial", building=False, activated_at=timezone.now()
+            ).pk
+        cache.set(ACTIVE_CACHE_KEY, generation_id, timeout=ACTIVE_CACHE_SECONDS)
+    return generation_id
+
+
+def revision_cache_key(generation_id: int) -> str:
+    return f"knowledge_generation:{generation_id}:revision"
+
+
+def generation_revision(generation_id: int) -> int:
+    """Counter bumped whenever a generation's documents change; part of derived cache keys."""
+    key = revision_cache_key(generation_id)
+    revision = cache.get(key)
+    if revision is None:
+        # Seeded from the clock so an evicted counter never reuses an old revision
+        cache.add(key, time.time_ns(), timeout=None)
+        revision = cache.get(key, 0)
+    return revision
+
+
+def touch_generation(generation_id: int) -> None:
+    try:
+        cache.incr(revision_cache_key(generation_id))
+    except ValueError:
+        cache.set(revision_cache_key(generation_id), time.time_ns(), timeout=None)
+
+
+def live_generation_ids() -> List[int]:
+    """The active generation plus any being built, i.e. everything incremental edits must reach."""
+    building = KnowledgeGeneration.objects.filter(building=True).values_list("id", flat=True)
+    return [active_generation_id(), *building]
+
+
+def _insert_clones(source_id: int, batch: List[KnowledgeDocument]) -> int:
+    created = KnowledgeDocument.objects.bulk_create(batch)
+    # bulk_create stamps auto_now(_add) fields; copies keep the originals' times, which
+    # chat and the sources sample order by
+    original = KnowledgeDocument.objects.filter(generation_id=source_id, source=OuterRef("source"))
+    KnowledgeDocument.objects.filter(pk__in=[doc.pk for doc in created]).update(
+        created_at=Subquery(original.values("created_at")[:1]),
+        updated_at=Subquery(original.values("updated_at")[:1]),
+    )
+    return len(created)
+
+
+def clone_documents(source_id: int, target_id: int, only: Optional[Q] = None) -> int:
+    """Copy document rows (not bodies, same timestamps) from one generation into another, in batches."""
+    batch_size = getattr(settings, "KNOWLEDGE_WRITE_BATCH_SIZE", 500)
+    rows = KnowledgeDocument.objects.filter(generation_id=source_id)
+    if only is not None:
+        rows = rows.filter(only)
+    copied, batch = 0, []
+    fields = ("source", "source_type", "title", "blob_id")
+    for source, source_type, title, blob_id in rows.values_list(*fields).iterator(chunk_size=batch_size):
+        batch.append(KnowledgeDocument(
+            generation_id=target_id, source=source, source_type=source_type, title=title, blob_id=blob_id
+        ))
+        if len(batch) >= batch_size:
+            copied += _insert_clones(source_id, batch)
+            batch = []
+    if batch:
+        copied += _insert_clones(source_id, batch)
+    touch_generation(target_id)
+    return copied
+
+
+def scope_q(scope: Iterable[str]) -> Q:
+    """Documents whose source starts with one of the `scope` prefixes."""
+    q = Q(pk__in=[])
+    for prefix in scope:
+        q |= Q(source__startswith=prefix)
+    return q
+
+
+def begin_generation(label: str, carry_over: bool = True, scope: Optional[List[str]] = None) -> KnowledgeGeneration:
+    """Create a building generation, seeded with the live documents unless `carry_over=False`.
+
+    `scope` lists the source prefixes the build will rewrite; everything else is refreshed
+    from the live generation when it is activated. None means the build owns everything.
+    """
+    based_on = active_generation_id() if carry_over else None
+    generation = KnowledgeGeneration.objects.create(label=label, based_on=based_on, scope=scope)
+    if carry_over:
+        clone_documents(based_on, generation.pk)
+    return generation
+
+
+@contextmanager
+def activation_lock(wait: float = 60.0):
+    deadline = time.monotonic() + wait
+    while not cache.add(ACTIVATE_LOCK_KEY, True, timeout=ACTIVATE_LOCK_SECONDS):
+        if time.monotonic() > deadline:
+            raise GenerationBusy("another knowledge generation is being activated")
+        time.sleep(0.2)
+    try:
+        yield
+    finally:
+        cache.delete(ACTIVATE_LOCK_KEY)
+
+
+def rebase_generation(generation: KnowledgeGeneration, live_id: int) -> int:
+    """Replace a build's rows outside its scope with the live generation's; returns rows copied."""
+    owned = scope_q(generation.scope)
+    KnowledgeDocument.objects.filter(generation_id=generation.pk).exclude(owned).delete()
+    return clone_documents(live_id, generation.pk, only=~owned)
+
+
+def activate_generation(generation_id: int) -> None:
+    """Make a generation live; a first activation is rebased onto the current live set first.
+
+    Generations that were live before (rollback, manual re-activation) are switched back
+    exactly as they were.
+    """
+    with activation_lock():
+        generation = KnowledgeGeneration.objects.get(pk=generation_id)
+        live_id = _live_generation_id()
+        if (
+            generation.activated_at is None
+            and generation.scope is not None
+            and live_id is not None
+            and live_id not in (generation.pk, generation.based_on)
+        ):
+            rebase_generation(generation, live_id)
+        KnowledgeGeneration.objects.filter(pk=generation_id).update(activated_at=timezone.now(), building=False)
+        cache.set(ACTIVE_CACHE_KEY, generation_id, timeout=ACTIVE_CACHE_SECONDS)
+
+
+def restore_sources(generation_id: int, prefix: str) -> int:
+    """Put a build's rows under `prefix` back to the live generation's (after a failed rewrite)."""
+    KnowledgeDocument.objects.filter(generation_id=generation_id, source__startswith=prefix).delete()
+    return clone_documents(active_generation_id(), generation_id, only=Q(source__startswith=prefix))
+
+
+def discard_generation(generation_id: int) -> None:
+    """Drop an unfinished generation (a failed or empty build); the live one is untouched."""
+    if generation_id == active_generation_id():
+        return
+    KnowledgeDocument.objects.filter(generation_id=generation_id).delete()
+    KnowledgeGeneration.objects.filter(pk=generation_id).delete()
+
+
+def rollback_generation() -> Optional[KnowledgeGeneration]:
+    """Re-activate the generation that was live before the current one."""
+    previous = (
+        KnowledgeGeneration.objects.filter(activated_at__isnull=False)
+        .exclude(pk=active_generation_id())
+        .order_by("-activated_at", "-id")
+        .first()
+    )
+    if previous is not None:
+        activate_generation(previous.pk)
+    return previous
+
+
+def collect_generations(keep: Optional[int] = None) -> int:
+    """Delete superseded generations beyond the newest `keep`, and builds abandoned for a day.
+
+    Finished generations that were never activated (`import_knowledge --no-activate`) are
+    collected once they are older than every generation still kept.
+    """
+    from .knowledge import prune_orphan_blobs
+
+    keep = getattr(settings, "KNOWLEDGE_GENERATIONS_KEEP", 3) if keep is None else keep
+    active_id = active_generation_id()
+    retired = (
+        KnowledgeGeneration.objects.filter(activated_at__isnull=False)
+        .exclude(pk=active_id)
+        .order_by("-activated_at", "-id")
+        .values_list("id", flat=True)
+    )
+    doomed = list(retired[max(keep - 1, 0):])
+    window_start = KnowledgeGeneration.objects.filter(
+        pk__in=[active_id, *retired[:max(keep - 1, 0)]]
+    ).aggregate(start=Min("created_at"))["start"]
+    doomed += KnowledgeGeneration.objects.filter(
+        activated_at__isnull=True, building=False, created_at__lt=window_start
+    ).values_list("id", flat=True)
+    doomed += KnowledgeGeneration.objects.filter(
+        building=True, created_at__lt=timezone.now() - timedelta(days=1)
+    ).values_list("id", flat=True)
+    if not doomed:
+        return 0
+    # Documents first, as one set-based delete, rather than a per-row cascade
+    KnowledgeDocument.objects.filter(generation_id__in=doomed).delete()
+    KnowledgeGeneration.objects.filter(pk__in=doomed).delete()
+    prune_orphan_blobs()
+    return len(doomed)
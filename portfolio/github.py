@@ -0,0 +1,230 @@
+"""GitHub REST client with rate-limit aware request scheduling.
+
+Every call made through `GitHubClient` goes through a `GitHubRateLimiter`, which reads
+the `X-RateLimit-*` headers (primary hourly budget) and `Retry-After` (secondary limits)
+from each response and decides whether the next call may go out now, should be paced,
+or has to wait for the window to reset.
+"""
+import hashlib
+import time
+from typing import Any, Callable, Dict, Iterator, Optional
+
+import requests
+from django.conf import settings
+from django.core.cache import cache
+
+API_ROOT = "https://api.github.com"
+
+
+def default_headers(token: str = "") -> Dict[str, str]:
+    headers = {
+        "Accept": "application/vnd.github+json",
+        "User-Agent": "portfolio-backend/1.0",
+        "X-GitHub-Api-Version": "2022-11-28",
+    }
+    if token:
+        headers["Authorization"] = f"Bearer {token}"
+    return headers
+
+
+def rate_limit_cache_key(token: str = "") -> str:
+    # Budgets are per token (or per IP when anonymous); never put the token itself in the key
+    ident = hashlib.sha256(token.encode("utf-8")).hexdigest()[:16] if token else "anonymous"
+    return f"github_rate_limit:{ident}"
+
+
+class RateLimitExhausted(Exception):
+    """The budget cannot be recovered within the allowed wait; resume at `reset_at` (epoch seconds)."""
+
+    def __init__(self, reset_at: float, message: str = ""):
+        super().__init__(message or f"GitHub rate limit exhausted until {int(reset_at)}")
+        self.reset_at = reset_at
+
+
+class GitHubRateLimiter:
+    """Paces requests so a job stays within the hourly budget instead of hitting the cliff.
+
+    - Below `pace_below` remaining calls, requests are spread evenly over the time left in
+      the window, so the budget lasts until it resets.
+    - At `reserve` remaining calls (kept for interactive use), the limiter waits for the reset
+      when it is at most `max_wait` seconds away, otherwise raises RateLimitExhausted so the
+      caller can pause the job and resume it after `reset_at`.
+    - A secondary-limit `Retry-After` blocks every call until it elapses (same `max_wait` rule).
+    - `budget` optionally caps the calls this limiter may spend, to share one token's budget
+      between parallel jobs.
+    """
+
+    def __init__(
+        self,
+        reserve: Optional[int] = None,
+        pace_below: Optional[int] = None,
+        max_wait: Optional[float] = None,
+        budget: Optional[int] = None,
+        sleep: Callable[[float], Any] = time.sleep,
+        clock: Callable[[], float] = time.time,
+    ):
+        self.reserve = reserve if reserve is not None else getattr(settings, "GITHUB_RATE_LIMIT_RESERVE", 50)
+        self.pace_below = pace_below if pace_below is not None else getattr(settings, "GITHUB_RATE_LIMIT_PACE_BELOW", 500)
+        self.max_wait = max_wait if max_wait is not None else getattr(settings, "GITHUB_RATE_LIMIT_MAX_WAIT", 30)
+        self.budget = budget
+        self.sleep = sleep
+        self.clock = clock
+        self.limit: Optional[int] = None
+        self.remaining: Optional[int] = None
+        self.reset_at: Optional[float] = None
+        self.retry_after_until = 0.0
+        self.used = 0
+        self.waited = 0.0
+
+    def before_request(self) -> None:
+        now = self.clock()
+        if self.budget is not None and self.used >= self.budget:
+            raise RateLimitExhausted(self.reset_at or now, "rate-limit share for this job is spent")
+        if self.retry_after_until > now:
+            self._wait(self.retry_after_until - now)
+            now = self.clock()
+        if self.remaining is None or self.reset_at is None:
+            return
+        if self.reset_at <= now:
+            # Window rolled over since the last response; the next response refreshes the numbers
+            self.remaining = self.limit
+            return
+        if self.remaining <= self.reserve:
+            self._wait(self.reset_at - now + 1)
+            self.remaining = self.limit
+            return
+        if self.remaining <= self.pace_below:
+            delay = (self.reset_at - now) / max(1, self.remaining - self.reserve)
+            # Pacing is best-effort: never block a single call longer than max_wait
+            if delay <= self.max_wait:
+                self.sleep(delay)
+                self.waited += delay
+
+    def _wait(self, seconds: float) -> None:
+        if seconds > self.max_wait:
+            raise RateLimitExhausted(self.clock() + seconds)
+        self.sleep(seconds)
+        self.waited += seconds
+
+    def resume_at(self) -> float:
+        """When a call that was just rate-limited is worth retrying (epoch seconds)."""
+        until = self.retry_after_until
+        if self.remaining == 0 and self.reset_at:
+            until = max(until, self.reset_at + 1)
+        # Without a hint from GitHub, give it at least a minute
+        return until if until > self.clock() else self.clock() + 60
+
+    def update(self, response: requests.Response) -> None:
+        self.used += 1
+        h = response.headers
+        now = self.clock()
+        try:
+            if h.get("X-RateLimit-Limit") is not None:
+                self.limit = int(h["X-RateLimit-Limit"])
+            if h.get("X-RateLimit-Remaining") is not None:
+                self.remaining = int(h["X-RateLimit-Remaining"])
+            if h.get("X-RateLimit-Reset") is not None:
+                self.reset_at = float(h["X-RateLimit-Reset"])
+        except (TypeError, ValueError):
+            pass
+        if response.status_code in (403, 429):
+            retry_after = h.get("Retry-After")
+            if retry_after:
+                try:
+                    self.retry_after_until = now + float(retry_after)
+                except ValueError:
+                    self.retry_after_until = now + 60
+            elif self.remaining is None or self.remaining > 0:
+                # Secondary limit without Retry-After: GitHub asks for at least a minute
+                if "rate limit" in (response.text or "").lower():
+                    self.retry_after_until = now + 60
+
+    @staticmethod
+    def is_rate_limited(response: requests.Response) -> bool:
+        if response.status_code not in (403, 429):
+            return False
+        h = response.headers
+        return bool(h.get("Retry-After")) or h.get("X-RateLimit-Remaining") == "0" or "rate limit" in (response.text or "").lower()
+
+    def snapshot(self) -> Dict[str, Any]:
+        now = self.clock()
+        return {
+            "limit": self.limit,
+            "remaining": self.remaining,
+            "reset_at": int(self.reset_at) if self.reset_at else None,
+            "retry_after": max(0, int(self.retry_after_until - now)) if self.retry_after_until > now else 0,
+            "used": self.used,
+            "budget": self.budget,
+            "waited_seconds": round(self.waited, 2),
+        }
+
+
+class GitHubClient:
+    """Thin requests wrapper: shared session + headers, every call scheduled by the limiter."""
+
+    def __init__(self, token: Optional[str] = None, limiter: Optional[GitHubRateLimiter] = None, session=None):
+        self.token = getattr(settings, "GITHUB_TOKEN", "") if token is None else token
+        self.limiter = limiter or GitHubRateLimiter()
+        self.session = session or requests.Session()
+        self.session.headers.update(default_headers(self.token))
+
+    def get(self, url: str, timeout: float = 30, **kwargs) -> requests.Response:
+        if url.startswith("/"):
+            url = API_ROOT + url
+        response = None
+        for attempt in range(2):
+            self.limiter.before_request()
+            response = self.session.get(url, timeout=timeout, **kwargs)
+            self.limiter.update(response)
+            if not self.limiter.is_rate_limited(response):
+                break
+            response.close()
+            if attempt == 1:
+                # Still limited after waiting: pause the job rather than lose this call's result
+                raise RateLimitExhausted(self.limiter.resume_at())
+            # One retry: before_request() now waits out Retry-After/reset, or raises
+        return response
+
+    def iter_pages(self, url: str, max_pages: int = 10, timeout: float = 20) -> Iterator[requests.Response]:
+        """Yield each page of a paginated listing, following the Link rel="next" header."""
+        seen = set()
+        while url and url not in seen and len(seen) < max_pages:
+            seen.add(url)
+            r = self.get(url, timeout=timeout)
+            yield r
+            if not r.ok:
+                return
+            url = (r.links.get("next") or {}).get("url")
+
+    def publish(self) -> Dict[str, Any]:
+        """Store the latest budget snapshot in the cache so other processes/endpoints can read it."""
+        snap = self.limiter.snapshot()
+        if snap["remaining"] is not None:
+            cache.set(rate_limit_cache_key(self.token), snap, timeout=60 * 60)
+        return snap
+
+
+def rate_limit_status(token: Optional[str] = None, refresh: bool = False) -> Dict[str, Any]:
+    """Remaining budget for the configured token: last published snapshot, or a live /rate_limit call.
+
+    GitHub does not count /rate_limit against the budget, so a live refresh is free.
+    """
+    token = getattr(settings, "GITHUB_TOKEN", "") if token is None else token
+    key = rate_limit_cache_key(token)
+    snap = None if refresh else cache.get(key)
+    if snap:
+        return snap
+    r = requests.get(f"{API_ROOT}/rate_limit", headers=default_headers(token), timeout=10)
+    r.raise_for_status()
+    core = ((r.json() or {}).get("resources") or {}).get("core") or {}
+    snap = {
+        "limit": core.get("limit"),
+        "remaining": core.get("remaining"),
+        "reset_at": core.get("reset"),
+        "retry_after": 0,
+        "used": core.get("used"),
+        "budget": None,
+        "waited_seconds": 0,
+    }
+    cache.set(key, snap, timeout=60 * 60)
+    return snap
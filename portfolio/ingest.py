@@ -0,0 +1,254 @@
+"""Pull repository source files from GitHub into KnowledgeDocument rows."""
+import uuid
+from collections import Counter
+from datetime import datetime, timezone as dt_timezone
+from typing import Any, Dict, Iterable, List, Optional
+
+from .content_filters import GitAttributes, classify_path, classify_sample, max_blob_bytes, sample_bytes
+from .generations import activate_generation, begin_generation, discard_generation, restore_sources, touch_generation
+from .github import GitHubClient, RateLimitExhausted
+from .knowledge import DocumentWriter, prune_orphan_blobs
+from .models import KnowledgeDocument
+
+# Filters
+SKIP_DIRS = {".git", "node_modules", "dist", "build", ".next", ".venv", "venv", ".cache", "__pycache__"}
+# Common code/text extensions
+INCLUDE_EXT = {
+    ".py", ".js", ".jsx", ".ts", ".tsx", ".json", ".yml", ".yaml", ".toml", ".ini", ".cfg",
+    ".css", ".scss", ".sass", ".html", ".md", ".txt", ".sql", ".sh", ".bat", ".ps1", ".rs", ".go",
+    ".java", ".kt", ".rb", ".php", ".c", ".h", ".cpp", ".hpp", ".cs"
+}
+# Blob bodies are streamed raw instead of as base64 inside JSON
+RAW_ACCEPT = {"Accept": "application/vnd.github.raw+json"}
+
+
+class RepositoryUnavailable(Exception):
+    """Repository metadata or tree could not be fetched (counted as skipped)."""
+
+
+def source_prefix(full_name: str) -> str:
+    return f"github_code:{full_name}:"
+
+
+def read_blob(client: GitHubClient, owner: str, repo: str, sha: str):
+    """Stream a blob's raw bytes; returns (bytes, None) or (None, reject_reason).
+
+    Only the leading sample is read before the content classifier runs, and reading stops
+    as soon as the size cap is exceeded, so rejected files are never held in memory in full.
+    """
+    r = client.get(f"/repos/{owner}/{repo}/git/blobs/{sha}", timeout=30, headers=RAW_ACCEPT, stream=True)
+    try:
+        if not r.ok:
+            return None, "unavailable"
+        cap = max_blob_bytes()
+        chunks = r.iter_content(chunk_size=sample_bytes())
+        first = next(chunks, b"")
+        reason = classify_sample(first)
+        if reason:
+            return None, reason
+        buf = bytearray(first)
+        for chunk in chunks:
+            buf.extend(chunk)
+            if len(buf) > cap:
+                return None, "too_large"
+        return bytes(buf), None
+    finally:
+        r.close()
+
+
+def load_gitattributes(client: GitHubClient, owner: str, repo: str, tree: List[dict]) -> GitAttributes:
+    attributes = GitAttributes()
+    for entry in tree:
+        path = entry.get("path") or ""
+        if entry.get("type") != "blob" or path.rsplit("/", 1)[-1] != ".gitattributes" or not entry.get("sha"):
+            continue
+        raw, _reason = read_blob(client, owner, repo, entry["sha"])
+        if raw:
+            base = path.rsplit("/", 1)[0] if "/" in path else ""
+            attributes.add(raw.decode("utf-8", errors="ignore"), base_dir=base)
+    return attributes
+
+
+def ingest_repository(
+    client: GitHubClient, full_name: str, writer: DocumentWriter, rejected: Optional[Counter] = None
+) -> int:
+    """Ingest every wanted file of one repository's default branch through `writer`.
+
+    Previously ingested documents of the repository are replaced, so a job that was paused
+    mid-repository by the rate limiter can simply re-run it on resume. Files turned away by
+    the content filters are tallied by reason in `rejected`. Returns the number of files queued.
+    """
+    if rejected is None:
+        rejected = Counter()
+    owner, repo = full_name.split("/", 1)
+    # Get default branch
+    meta = client.get(f"/repos/{owner}/{repo}", timeout=20)
+    if not meta.ok:
+        raise RepositoryUnavailable(f"{full_name}: metadata {meta.status_code}")
+    default_branch = (meta.json() or {}).get("default_branch") or "main"
+    # Get tree (recursive)
+    tree_r = client.get(f"/repos/{owner}/{repo}/git/trees/{default_branch}?recursive=1", timeout=30)
+    if not tree_r.ok:
+        raise RepositoryUnavailable(f"{full_name}: tree {tree_r.status_code}")
+    tree = (tree_r.json() or {}).get("tree") or []
+    attributes = load_gitattributes(client, owner, repo, tree)
+
+    # Buffered rows of earlier repos must land before this repo's old rows are replaced
+    writer.flush()
+    KnowledgeDocument.objects.filter(
+        generation_id=writer.generation_id, source__startswith=source_prefix(f"{owner}/{repo}")
+    ).delete()
+    touch_generation(writer.generation_id)
+    queued = 0
+    for entry in tree:
+        if entry.get("type") != "blob":
+            continue
+        path = entry.get("path") or ""
+        # Skip unneeded directories
+        parts = path.split("/")
+        if any(p in SKIP_DIRS for p in parts):
+            continue
+        # Extension filter
+        ext = "." + path.rsplit(".", 1)[-1] if "." in path else ""
+        if ext and ext.lower() not in INCLUDE_EXT:
+            continue
+        sha = entry.get("sha")
+        if not sha:
+            continue
+        # Tree entries carry the blob size: oversized/generated/vendored files cost no download
+        reason = classify_path(path, entry.get("size"), attributes)
+        if reason:
+            rejected[reason] += 1
+            continue
+        raw, reason = read_blob(client, owner, repo, sha)
+        if reason:
+            rejected[reason] += 1
+            continue
+        try:
+            text = raw.decode("utf-8")
+        except Exception:
+            # Try latin-1 fallback
+            try:
+                text = raw.decode("latin-1")
+            except Exception:
+                continue
+        # Stored without the Repo/File header so identical files in other repos share the body
+        writer.add(f"github_code:{owner}/{repo}:{path}", f"{owner}/{repo}:{path}", text)
+        queued += 1
+    writer.flush()
+    return queued
+
+
+def ingest_repositories(
+    client: GitHubClient,
+    repos: Iterable[str],
+    prune: bool = True,
+    generation_id: Optional[int] = None,
+    activate: Optional[bool] = None,
+) -> Dict[str, Any]:
+    """Ingest repositories in order until done or the rate limiter asks to pause.
+
+    Returns ingested documents, the skipped count, per-reason counts of files rejected by the
+    content filters, and — when paused — the repositories still `pending` (including the
+    interrupted one) with `resume_at` (epoch seconds). Parallel jobs pass `prune=False` and
+    leave orphaned bodies to the aggregating callback, so they never race each other's writes.
+
+    Without `generation_id` the ingest builds its own generation (scoped to these repos)
+    and activates it once every repo was processed and at least one file was written; chat
+    keeps reading the previous one meanwhile. A paused run is never activated: its
+    `generation` is returned for the resumed run, which passes it back with `activate=True`.
+    A repo that fails partway has its rows put back as they are live. Fan-out tasks write
+    into the job's shared generation and the callback activates it.
+    """
+    repos = list(repos)
+    own_generation = generation_id is None
+    if activate is None:
+        activate = own_generation
+    if own_generation:
+        generation_id = begin_generation("ingest", scope=[source_prefix(r) for r in repos if "/" in r]).pk
+    writer = DocumentWriter(generation_id=generation_id)
+    skipped = 0
+    rejected: Counter = Counter()
+    pending: List[str] = []
+    resume_at: Optional[float] = None
+    for i, full_name in enumerate(repos):
+        if "/" not in full_name:
+            continue
+        try:
+            ingest_repository(client, full_name, writer, rejected)
+        except RateLimitExhausted as e:
+            pending = repos[i:]
+            resume_at = e.reset_at
+            break
+        except Exception:
+            skipped += 1
+            # Never leave a half-written repo in the build: back to its live rows
+            writer.discard(source_prefix(full_name))
+            restore_sources(generation_id, source_prefix(full_name))
+            continue
+    writer.flush()
+    if activate and not pending:
+        if writer.written or not own_generation:
+            activate_generation(generation_id)
+        else:
+            discard_generation(generation_id)
+    if prune:
+        prune_orphan_blobs()
+    return {
+        "ingested": writer.written,
+        "skipped": skipped,
+        "rejected": dict(rejected),
+        "pending": pending,
+        "resume_at": resume_at,
+        "generation": generation_id,
+        "rate_limit": client.publish(),
+        "write_stats": writer.log_stats("github code ingest"),
+    }
+
+
+def resume_eta(resume_at: Optional[float]) -> Optional[datetime]:
+    if not resume_at:
+        return None
+    return datetime.fromtimestamp(resume_at, tz=dt_timezone.utc)
+
+
+def job_cache_key(job_id: str) -> str:
+    return f"knowledge_ingest_job:{job_id}"
+
+
+def dispatch_fanout(repos: List[str]) -> Dict[str, Any]:
+    """Ingest each repository in its own Celery task (a chord) and aggregate in a callback.
+
+    The token's remaining budget (minus the reserve) is split evenly, so one large
+    repository cannot starve the others; a task whose share runs out reports its repo as
+    pending and the callback re-queues it after the reset.
+    """
+    from celery import chord
+    from django.conf import settings
+    from django.core.cache import cache
+    from django.utils import timezone
+
+    from .github import rate_limit_status
+    from .tasks import ingest_github_repo, summarize_github_ingest
+
+    repos = [r for r in repos if "/" in r]
+    share = None
+    try:
+        remaining = rate_limit_status().get("remaining")
+        if remaining is not None and repos:
+            share = max(1, (remaining - getattr(settings, "GITHUB_RATE_LIMIT_RESERVE", 50)) // len(repos))
+    except Exception:
+        pass  # unknown budget: tasks still pace themselves from response headers
+    job_id = uuid.uuid4().hex
+    started_at = timezone.now().isoformat()
+    # All repo tasks write into one generation that the callback activates
+    generation_id = begin_generation("ingest", scope=[source_prefix(r) for r in repos]).pk
+    status = {
+        "job_id": job_id, "status": "running", "repos": len(repos), "rate_limit_share": share,
+        "started_at": started_at, "generation": generation_id,
+    }
+    cache.set(job_cache_key(job_id), status, timeout=24 * 60 * 60)
+    chord(ingest_github_repo.s(full_name, share, generation_id) for full_name in repos)(
+        summarize_github_ingest.s(job_id=job_id, started_at=started_at, generation_id=generation_id)
+    )
+    return status
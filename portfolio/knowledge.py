@@ -0,0 +1,343 @@
+"""Knowledge base storage helpers: content-addressed bodies, batched writes and prompt packing."""
+import hashlib
+import logging
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.utils import timezone
+
+from .generations import (
+    activate_generation,
+    active_generation_id,
+    begin_generation,
+    discard_generation,
+    touch_generation,
+)
+from .code_index import symbol_rows
+from .models import KNOWLEDGE_SOURCE_TYPES, KnowledgeBlob, KnowledgeDocument, KnowledgeSymbol, knowledge_source_type
+from .search import index_blobs, prune_index
+from .summaries import SUMMARY_MAX_CHARS, summarize
+
+logger = logging.getLogger(__name__)
+# Joins packed chunks in the prompt's knowledge context
+CHUNK_SEPARATOR = "\n---\n"
+# Writers that may reference existing bodies, and the orphan prune that must not run meanwhile
+BLOB_WRITERS_KEY = "knowledge_blobs:writers"
+BLOB_PRUNE_KEY = "knowledge_blobs:prune"
+BLOB_LOCK_SECONDS = 30 * 60
+
+
+def content_hash(text: str) -> str:
+    return hashlib.sha256((text or "").encode("utf-8")).hexdigest()
+
+
+class BlobsBusy(Exception):
+    """An orphan prune held the blob lock for longer than a writer was willing to wait."""
+
+
+def _writers_register() -> None:
+    cache.add(BLOB_WRITERS_KEY, 0, timeout=BLOB_LOCK_SECONDS)
+    try:
+        cache.incr(BLOB_WRITERS_KEY)
+    except ValueError:  # expired in between
+        cache.add(BLOB_WRITERS_KEY, 1, timeout=BLOB_LOCK_SECONDS)
+    _writers_keep_alive()
+
+
+def _writers_keep_alive() -> None:
+    # Every writer renews the count's TTL, so it only lapses once nobody has touched it for
+    # BLOB_LOCK_SECONDS (writers that died without unregistering)
+    cache.touch(BLOB_WRITERS_KEY, BLOB_LOCK_SECONDS)
+
+
+def _writers_unregister() -> None:
+    # A lapsed count is not recreated just to go negative and hide the next writer
+    if not cache.touch(BLOB_WRITERS_KEY, BLOB_LOCK_SECONDS):
+        return
+    try:
+        count = cache.decr(BLOB_WRITERS_KEY)
+    except ValueError:
+        return
+    if count < 0:
+        cache.incr(BLOB_WRITERS_KEY, -count)
+
+
+@contextmanager
+def blob_references(wait: float = 5 * 60):
+    """Shared side of the blob lock: hold it while committing documents that reuse stored bodies.
+
+    `prune_orphan_blobs` takes the exclusive side, so a body a writer found present is not
+    deleted before the writer's documents reference it. Raises BlobsBusy if a prune still
+    runs after `wait` seconds. Yields a keep-alive callable for holders that run for a long
+    time (snapshot imports); call it every batch.
+    """
+    deadline = time.monotonic() + wait
+    while True:
+        # Register first, then look for a prune: either it sees us or we see it
+        _writers_register()
+        if not cache.get(BLOB_PRUNE_KEY):
+            break
+        _writers_unregister()
+        if time.monotonic() > deadline:
+            raise BlobsBusy("knowledge blobs are being pruned")
+        time.sleep(0.2)
+    try:
+        yield _writers_keep_alive
+    finally:
+        _writers_unregister()
+
+
+class DocumentWriter:
+    """Buffers knowledge documents and persists them in batches.
+
+    Each flush is one transaction: a single existence query for the batch's bodies, one
+    `bulk_create` for new bodies, and one `bulk_create` for the documents (plus, with
+    `upsert=True`, one lookup and one `bulk_update` for sources that already exist). That
+    turns thousands of per-row round trips through the pooler into a handful per batch.
+    Use as a context manager, or call `flush()` when done; `stats()` reports throughput so
+    KNOWLEDGE_WRITE_BATCH_SIZE can be tuned. Documents go to the live generation unless
+    `generation_id` names another (see portfolio.generations).
+    """
+
+    def __init__(self, batch_size: Optional[int] = None, upsert: bool = False, generation_id: Optional[int] = None):
+        self.batch_size = batch_size or getattr(settings, "KNOWLEDGE_WRITE_BATCH_SIZE", 500)
+        self.upsert = upsert
+        self.generation_id = generation_id or active_generation_id()
+        self.pending: List[Tuple[str, str, str]] = []
+        self.written: List[KnowledgeDocument] = []
+        self.created = 0
+        self.updated = 0
+        self.batches = 0
+        self.seconds = 0.0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.flush()
+
+    def add(self, source: str, title: str, body: str) -> None:
+        """Queue a document; for `github_code:` sources pass the body without the Repo/File header."""
+        self.pending.append((source, title, body or ""))
+        if len(self.pending) >= self.batch_size:
+            self.flush()
+
+    def discard(self, prefix: str) -> None:
+        """Forget queued and written documents under `prefix` (their rows are removed by the caller)."""
+        self.pending = [entry for entry in self.pending if not entry[0].startswith(prefix)]
+        self.written = [doc for doc in self.written if not doc.source.startswith(prefix)]
+
+    def flush(self) -> None:
+        if not self.pending:
+            return
+        batch, self.pending = self.pending, []
+        started = time.perf_counter()
+        # Blob instances are attached to the documents so callers can read `content` without queries
+        blobs, first_source = {}, {}
+        for source, _, body in batch:
+            digest = content_hash(body)
+            # Plain text in memory; only bodies actually stored below pay for compression
+            blobs.setdefault(digest, KnowledgeBlob(hash=digest, text=body))
+            first_source.setdefault(digest, source)
+        with blob_references(), transaction.atomic():
+            known = set(KnowledgeBlob.objects.filter(hash__in=list(blobs)).values_list("hash", flat=True))
+            new_blobs = [blob for digest, blob in blobs.items() if digest not in known]
+            for blob in new_blobs:
+                blob.summary = summarize(first_source[blob.hash], blob.text)
+                blob.content = blob.text
+            KnowledgeBlob.objects.bulk_create(
+                new_blobs,
+                ignore_conflicts=True,  # a concurrent writer may have stored the same body
+            )
+            index_blobs({blob.hash: blob.content for blob in new_blobs})
+            # Exact-lookup keys for code: paths of every file, definitions of bodies not seen before
+            KnowledgeSymbol.objects.bulk_create(
+                symbol_rows(
+                    ((source, content_hash(body), body) for source, _, body in batch),
+                    {blob.hash for blob in new_blobs},
+                ),
+                ignore_conflicts=True,
+            )
+            existing: Dict[str, KnowledgeDocument] = {}
+            if self.upsert:
+                docs = KnowledgeDocument.objects.filter(generation_id=self.generation_id)
+                for doc in docs.filter(source__in=[src for src, _, _ in batch]):
+                    existing[doc.source] = doc
+            to_create, to_update = [], []
+            now = timezone.now()
+            for source, title, body in batch:
+                blob = blobs[content_hash(body)]
+                doc = existing.get(source)
+                if doc is None:
+                    to_create.append(KnowledgeDocument(
+                        generation_id=self.generation_id,
+                        source=source,
+                        source_type=knowledge_source_type(source),
+                        title=title,
+                        blob=blob,
+                    ))
+                    continue
+                if doc.blob_id != blob.hash or doc.title != title:
+                    doc.title, doc.updated_at = title, now
+                    to_update.append(doc)
+                doc.blob = blob
+                self.written.append(doc)
+            created = KnowledgeDocument.objects.bulk_create(to_create)
+            if to_update:
+                KnowledgeDocument.objects.bulk_update(to_update, ["blob", "title", "updated_at"])
+        touch_generation(self.generation_id)
+        self.written.extend(created)
+        self.created += len(created)
+        self.updated += len(to_update)
+        self.batches += 1
+        self.seconds += time.perf_counter() - started
+
+    def stats(self) -> Dict[str, Any]:
+        rows = self.created + self.updated
+        return {
+            "rows": rows,
+            "created": self.created,
+            "updated": self.updated,
+            "batches": self.batches,
+            "batch_size": self.batch_size,
+            "seconds": round(self.seconds, 3),
+            "rows_per_sec": round(rows / self.seconds, 1) if self.seconds else None,
+        }
+
+    def log_stats(self, label: str) -> Dict[str, Any]:
+        stats = self.stats()
+        logger.info("%s: wrote %s rows in %s batches (%ss, %s rows/s, batch_size=%s)", label, stats["rows"],
+                    stats["batches"], stats["seconds"], stats["rows_per_sec"], stats["batch_size"])
+        return stats
+
+
+def sync_documents(
+    documents: Iterable[Tuple[str, str, str]], batch_size: Optional[int] = None, generation_id: Optional[int] = None
+) -> Dict[str, Any]:
+    """Bring site-derived documents in line with `documents`, writing only the differences.
+
+    Stored `(content hash, title)` pairs are loaded in one query and compared with the
+    expected ones, so unchanged documents cost no writes; new and changed documents go
+    through a batched upserting writer and documents no longer produced are deleted.
+    Ingested `github_code:` documents are never touched. Works on the live generation
+    unless `generation_id` is given.
+    """
+    started = time.perf_counter()
+    generation_id = generation_id or active_generation_id()
+    site_docs = KnowledgeDocument.objects.filter(generation_id=generation_id).exclude(source__startswith="github_code:")
+    stored = {
+        source: (blob_id, title) for source, blob_id, title in site_docs.values_list("source", "blob_id", "title")
+    }
+    seen = set()
+    unchanged = 0
+    with DocumentWriter(batch_size=batch_size, upsert=True, generation_id=generation_id) as writer:
+        for source, title, body in documents:
+            seen.add(source)
+            if stored.get(source) == (content_hash(body), title):
+                unchanged += 1
+                continue
+            writer.add(source, title, body)
+    removed = [source for source in stored if source not in seen]
+    for i in range(0, len(removed), writer.batch_size):
+        site_docs.filter(source__in=removed[i:i + writer.batch_size]).delete()
+    if removed:
+        touch_generation(generation_id)
+    if writer.updated or removed:
+        prune_orphan_blobs()
+    return {
+        "created": writer.created,
+        "updated": writer.updated,
+        "removed": len(removed),
+        "unchanged": unchanged,
+        "batches": writer.batches,
+        "seconds": round(time.perf_counter() - started, 3),
+    }
+
+
+def rebuild_generation(documents: Iterable[Tuple[str, str, str]], label: str = "refresh") -> Dict[str, Any]:
+    """Apply `documents` to a copy of the live generation, then switch readers over to it.
+
+    The build owns the site sources only; code rows ingested meanwhile are kept at activation.
+    """
+    site = [t for t in KNOWLEDGE_SOURCE_TYPES if t != "github_code"]
+    generation = begin_generation(label, scope=site)
+    try:
+        stats = sync_documents(documents, generation_id=generation.pk)
+    except Exception:
+        discard_generation(generation.pk)
+        raise
+    activate_generation(generation.pk)
+    stats["generation"] = generation.pk
+    return stats
+
+
+def prune_orphan_blobs(wait: float = 60) -> int:
+    """Delete bodies no document references any more.
+
+    Waits for in-flight writers (see `blob_references`); if they don't finish within `wait`
+    seconds the prune is skipped, and the orphans go with the next one.
+    """
+    if not cache.add(BLOB_PRUNE_KEY, True, timeout=BLOB_LOCK_SECONDS):
+        return 0  # another prune is running
+    try:
+        deadline = time.monotonic() + wait
+        while (cache.get(BLOB_WRITERS_KEY) or 0) > 0:
+            if time.monotonic() > deadline:
+                logger.info("knowledge prune skipped: writers still active")
+                return 0
+            time.sleep(0.2)
+        _, per_model = KnowledgeBlob.objects.filter(documents__isnull=True).delete()
+    finally:
+        cache.delete(BLOB_PRUNE_KEY)
+    deleted = per_model.get(KnowledgeBlob._meta.label, 0)
+    if deleted:
+        prune_index()
+    return deleted
+
+
+def pack_documents(
+    docs: Iterable[KnowledgeDocument], budget: Optional[int] = None, full_top: Optional[int] = None
+) -> List[str]:
+    """Render documents as prompt chunks, collapsing identical bodies into one chunk.
+
+    The first occurrence keeps its position; later copies only add their source to the
+    chunk's header so the model still knows every place the content lives. With a
+    `budget` (characters, separators included) only the first `full_top` chunks (all when
+    None) may use the full body; the rest, and any full body that doesn't fit, fall back to
+    the stored summary, and chunks that fit in neither form are dropped.
+    """
+    order: List[str] = []
+    groups: Dict[str, List[KnowledgeDocument]] = {}
+    for doc in docs:
+        if doc.blob_id not in groups:
+            groups[doc.blob_id] = []
+            order.append(doc.blob_id)
+        groups[doc.blob_id].append(doc)
+    chunks: List[str] = []
+    used = 0
+    for rank, key in enumerate(order):
+        first, *copies = groups[key]
+        header = first.header
+        others = [d.title or d.source for d in copies if d.source != first.source]
+        if others and header:
+            header = header.rstrip("\n") + f"\nAlso in: {', '.join(others)}\n\n"
+        if budget is None:
+            chunks.append(header + first.blob.content)
+            continue
+        tiers = (True, False) if full_top is None or rank < full_top else (False,)
+        for full in tiers:
+            # The summary tier doesn't read `content`, so compressed bodies stay compressed
+            if full:
+                chunk = header + first.blob.content
+            else:
+                chunk = header + "Summary: " + (first.blob.summary or first.blob.content[:SUMMARY_MAX_CHARS])
+            if used + len(chunk) + len(CHUNK_SEPARATOR) <= budget:
+                chunks.append(chunk)
+                used += len(chunk) + len(CHUNK_SEPARATOR)
+                break
+    return chunks
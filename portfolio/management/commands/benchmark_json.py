@@ -0,0 +1,37 @@
+import json
+import timeit
+
+from django.core.management.base import BaseCommand
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIRequestFactory
+
+from portfolio import renderers
+from portfolio.bundle import build_bundle
+from portfolio.views import BlogPostViewSet, ProjectViewSet, SkillViewSet
+
+
+class Command(BaseCommand):
+    help = "Compare stdlib and orjson render times on the bundle and list endpoint payloads."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--repeat", type=int, default=200, help="Renders per payload and renderer.")
+
+    def handle(self, *args, **options):
+        if renderers.orjson is None:
+            self.stdout.write(self.style.WARNING("orjson is not installed; FastJSONRenderer falls back to stdlib."))
+        factory = APIRequestFactory()
+        payloads = {"bundle": json.loads(build_bundle())}
+        for name, viewset in (("projects", ProjectViewSet), ("skills", SkillViewSet), ("blogposts", BlogPostViewSet)):
+            # The list response data as the view builds it, unpaginated so every row is rendered
+            view = viewset.as_view({"get": "list"}, pagination_class=None)
+            payloads[name] = view(factory.get(f"/api/{name}/")).data
+        stdlib, fast = JSONRenderer(), renderers.FastJSONRenderer()
+        repeat = options["repeat"]
+        for name, data in payloads.items():
+            size = len(stdlib.render(data))
+            slow_ms = timeit.timeit(lambda: stdlib.render(data), number=repeat) * 1000 / repeat
+            fast_ms = timeit.timeit(lambda: fast.render(data), number=repeat) * 1000 / repeat
+            self.stdout.write(
+                f"{name:<10} {size:>9} bytes  stdlib {slow_ms:8.3f} ms  fast {fast_ms:8.3f} ms  "
+                f"x{slow_ms / fast_ms if fast_ms else 0:.1f}"
+            )
@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from portfolio.snapshots import SnapshotError, export_snapshot
+
+
+class Command(BaseCommand):
+    help = "Export the live knowledge generation (bodies, symbols, documents) to a snapshot file."
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="Snapshot file; .gz (or .zst with zstandard installed) compresses it.")
+
+    def handle(self, *args, **options):
+        try:
+            counts = export_snapshot(options["path"])
+        except SnapshotError as e:
+            raise CommandError(str(e))
+        self.stdout.write(self.style.SUCCESS(
+            f"Exported {counts.get('doc', 0)} documents, {counts.get('blob', 0)} bodies and "
+            f"{counts.get('symbol', 0)} symbols to {options['path']}."
+        ))
@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from portfolio.snapshots import SnapshotError, import_snapshot
+
+
+class Command(BaseCommand):
+    help = "Import a knowledge snapshot (see export_knowledge) as a new generation and activate it."
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="Snapshot file written by export_knowledge.")
+        parser.add_argument(
+            "--no-activate",
+            action="store_true",
+            help="Load the generation but keep serving the current one (activate it later via the API; "
+            "it is collected once older than every kept generation).",
+        )
+
+    def handle(self, *args, **options):
+        try:
+            result = import_snapshot(options["path"], activate=not options["no_activate"])
+        except (SnapshotError, OSError, ValueError) as e:
+            raise CommandError(str(e))
+        state = "activated" if result["activated"] else "not activated"
+        self.stdout.write(self.style.SUCCESS(
+            f"Imported {result['doc']} documents, {result['blob']} bodies and {result['symbol']} symbols "
+            f"into generation {result['generation']} ({state})."
+        ))
@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from portfolio.code_index import rebuild_symbols
+from portfolio.search import backend, rebuild_index
+
+
+class Command(BaseCommand):
+    help = "Rebuild the full-text index and the code symbol index from stored knowledge bodies."
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            bodies = rebuild_index()
+            symbols = rebuild_symbols()
+        self.stdout.write(self.style.SUCCESS(
+            f"Indexed {bodies} bodies ({backend()} full-text) and {symbols} code symbols."
+        ))
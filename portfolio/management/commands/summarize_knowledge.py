@@ -0,0 +1,28 @@
+from django.core.management.base import BaseCommand
+
+from portfolio.models import KnowledgeBlob, KnowledgeDocument
+from portfolio.summaries import summarize
+
+
+class Command(BaseCommand):
+    help = "Fill in heuristic summaries for stored knowledge bodies (only missing ones unless --all)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--all", action="store_true", help="Recompute every summary.")
+        parser.add_argument("--batch-size", type=int, default=500)
+
+    def handle(self, *args, **options):
+        blobs = KnowledgeBlob.objects.only("hash", "text", "compressed", "summary")
+        if not options["all"]:
+            blobs = blobs.filter(summary="")
+        done, batch = 0, []
+        for blob in blobs.iterator(chunk_size=options["batch_size"]):
+            # Any document using the body tells us what kind of source (and file type) it is
+            source = KnowledgeDocument.objects.filter(blob_id=blob.hash).values_list("source", flat=True).first()
+            blob.summary = summarize(source or "", blob.content)
+            batch.append(blob)
+            if len(batch) >= options["batch_size"]:
+                KnowledgeBlob.objects.bulk_update(batch, ["summary"])
+                done, batch = done + len(batch), []
+        KnowledgeBlob.objects.bulk_update(batch, ["summary"])
+        self.stdout.write(self.style.SUCCESS(f"Summarized {done + len(batch)} knowledge bodies."))
@@ -0,0 +1,65 @@
+import hashlib
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def move_content_to_blobs(apps, schema_editor):
+    KnowledgeBlob = apps.get_model("portfolio", "KnowledgeBlob")
+    KnowledgeDocument = apps.get_model("portfolio", "KnowledgeDocument")
+    for doc in KnowledgeDocument.objects.all().iterator():
+        body = doc.content or ""
+        # Code documents keep only the file body; the "Repo/File" header is derived from source
+        if doc.source.startswith("github_code:"):
+            repo, _, path = doc.source[len("github_code:"):].partition(":")
+            header = f"Repo: {repo}\nFile: {path}\n\n"
+            if body.startswith(header):
+                body = body[len(header):]
+        digest = hashlib.sha256(body.encode("utf-8")).hexdigest()
+        KnowledgeBlob.objects.get_or_create(hash=digest, defaults={"content": body})
+        KnowledgeDocument.objects.filter(pk=doc.pk).update(blob_id=digest)
+
+
+def restore_content(apps, schema_editor):
+    KnowledgeDocument = apps.get_model("portfolio", "KnowledgeDocument")
+    for doc in KnowledgeDocument.objects.select_related("blob").iterator():
+        header = ""
+        if doc.source.startswith("github_code:"):
+            repo, _, path = doc.source[len("github_code:"):].partition(":")
+            header = f"Repo: {repo}\nFile: {path}\n\n"
+        KnowledgeDocument.objects.filter(pk=doc.pk).update(content=header + doc.blob.content)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("portfolio", "0013_alter_blogpost_slug"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="KnowledgeBlob",
+            fields=[
+                ("hash", models.CharField(max_length=64, primary_key=True, serialize=False)),
+                ("content", models.TextField()),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        migrations.AddField(
+            model_name="knowledgedocument",
+            name="blob",
+            field=models.ForeignKey(
+                db_column="content_hash",
+                null=True,
+                on_delete=django.db.models.deletion.PROTECT,
+                related_name="documents",
+                to="portfolio.knowledgeblob",
+            ),
+        ),
+        migrations.AlterField(
+            model_name="knowledgedocument",
+            name="content",
+            field=models.TextField(blank=True),
+        ),
+        migrations.RunPython(move_content_to_blobs, restore_content),
+    ]
@@ -0,0 +1,28 @@
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    # Separate from 0014 so the data copy commits before the table is altered (Postgres
+    # refuses ALTER TABLE with pending deferred FK checks in the same transaction).
+
+    dependencies = [
+        ("portfolio", "0014_knowledgeblob"),
+    ]
+
+    operations = [
+        migrations.RemoveField(
+            model_name="knowledgedocument",
+            name="content",
+        ),
+        migrations.AlterField(
+            model_name="knowledgedocument",
+            name="blob",
+            field=models.ForeignKey(
+                db_column="content_hash",
+                on_delete=django.db.models.deletion.PROTECT,
+                related_name="documents",
+                to="portfolio.knowledgeblob",
+            ),
+        ),
+    ]
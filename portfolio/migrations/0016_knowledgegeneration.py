@@ -0,0 +1,45 @@
+import django.db.models.deletion
+from django.db import migrations, models
+from django.utils import timezone
+
+
+def adopt_existing_documents(apps, schema_editor):
+    KnowledgeGeneration = apps.get_model("portfolio", "KnowledgeGeneration")
+    KnowledgeDocument = apps.get_model("portfolio", "KnowledgeDocument")
+    # Everything stored so far becomes the first live generation
+    generation = KnowledgeGeneration.objects.create(label="initial", building=False, activated_at=timezone.now())
+    KnowledgeDocument.objects.update(generation=generation)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("portfolio", "0015_remove_knowledgedocument_content"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="KnowledgeGeneration",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("label", models.CharField(blank=True, max_length=50)),
+                ("building", models.BooleanField(default=True)),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                ("activated_at", models.DateTimeField(blank=True, db_index=True, null=True)),
+            ],
+            options={
+                "ordering": ["-created_at", "-id"],
+            },
+        ),
+        migrations.AddField(
+            model_name="knowledgedocument",
+            name="generation",
+            field=models.ForeignKey(
+                null=True,
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="documents",
+                to="portfolio.knowledgegeneration",
+            ),
+        ),
+        migrations.RunPython(adopt_existing_documents, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,26 @@
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    # Separate from 0016 for the same reason as 0015: the data update must commit first.
+
+    dependencies = [
+        ("portfolio", "0016_knowledgegeneration"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="knowledgedocument",
+            name="generation",
+            field=models.ForeignKey(
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="documents",
+                to="portfolio.knowledgegeneration",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="knowledgedocument",
+            index=models.Index(fields=["generation", "source"], name="portfolio_k_generat_038372_idx"),
+        ),
+    ]
@@ -0,0 +1,30 @@
+from django.db import migrations, models
+
+SOURCE_TYPES = ["profile", "project", "skill", "blog", "experience", "github_code"]
+
+
+def fill_source_type(apps, schema_editor):
+    KnowledgeDocument = apps.get_model("portfolio", "KnowledgeDocument")
+    KnowledgeDocument.objects.filter(source="profile").update(source_type="profile")
+    for kind in SOURCE_TYPES:
+        KnowledgeDocument.objects.filter(source__startswith=f"{kind}:").update(source_type=kind)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("portfolio", "0017_alter_knowledgedocument_generation"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="knowledgedocument",
+            name="source_type",
+            field=models.CharField(blank=True, editable=False, max_length=20),
+        ),
+        migrations.RunPython(fill_source_type, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name="knowledgedocument",
+            index=models.Index(fields=["generation", "source_type"], name="portfolio_k_generat_629458_idx"),
+        ),
+    ]
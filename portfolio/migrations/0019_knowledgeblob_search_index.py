@@ -0,0 +1,42 @@
+from django.db import migrations
+
+# Full-text index for portfolio.search; not modelled in the ORM because it is backend-specific.
+BLOB_TABLE = "portfolio_knowledgeblob"
+FTS_TABLE = "portfolio_knowledgeblob_fts"
+
+
+def create_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == "postgresql":
+        schema_editor.execute(f"ALTER TABLE {BLOB_TABLE} ADD COLUMN search_vector tsvector")
+        schema_editor.execute(f"UPDATE {BLOB_TABLE} SET search_vector = to_tsvector('simple', content)")
+        schema_editor.execute(
+            f"CREATE INDEX portfolio_knowledgeblob_search_gin ON {BLOB_TABLE} USING gin (search_vector)"
+        )
+    elif vendor == "sqlite":
+        try:
+            schema_editor.execute(
+                f"CREATE VIRTUAL TABLE {FTS_TABLE} USING fts5(hash UNINDEXED, content, tokenize='unicode61')"
+            )
+        except Exception:
+            return  # SQLite built without FTS5: search falls back to LIKE matching
+        schema_editor.execute(f"INSERT INTO {FTS_TABLE} (hash, content) SELECT hash, content FROM {BLOB_TABLE}")
+
+
+def drop_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == "postgresql":
+        schema_editor.execute(f"ALTER TABLE {BLOB_TABLE} DROP COLUMN IF EXISTS search_vector")
+    elif vendor == "sqlite":
+        schema_editor.execute(f"DROP TABLE IF EXISTS {FTS_TABLE}")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("portfolio", "0018_knowledgedocument_source_type"),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
@@ -0,0 +1,38 @@
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    # Existing code documents are indexed with `manage.py rebuild_knowledge_index`.
+
+    dependencies = [
+        ("portfolio", "0019_knowledgeblob_search_index"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="KnowledgeSymbol",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("name", models.CharField(max_length=200)),
+                (
+                    "kind",
+                    models.CharField(choices=[("definition", "Definition"), ("path", "Path")], max_length=12),
+                ),
+                (
+                    "blob",
+                    models.ForeignKey(
+                        db_column="content_hash",
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="symbols",
+                        to="portfolio.knowledgeblob",
+                    ),
+                ),
+            ],
+            options={
+                "constraints": [
+                    models.UniqueConstraint(fields=("name", "blob", "kind"), name="uniq_knowledge_symbol")
+                ],
+            },
+        ),
+    ]
@@ -0,0 +1,47 @@
+import zlib
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+def compress_large_bodies(apps, schema_editor):
+    KnowledgeBlob = apps.get_model("portfolio", "KnowledgeBlob")
+    threshold = getattr(settings, "KNOWLEDGE_COMPRESS_MIN_BYTES", 4096)
+    for blob in KnowledgeBlob.objects.filter(compressed__isnull=True).iterator(chunk_size=200):
+        data = blob.text.encode("utf-8")
+        if len(data) >= threshold:
+            KnowledgeBlob.objects.filter(pk=blob.pk).update(text="", compressed=zlib.compress(data, 6))
+
+
+def decompress_bodies(apps, schema_editor):
+    KnowledgeBlob = apps.get_model("portfolio", "KnowledgeBlob")
+    for blob in KnowledgeBlob.objects.filter(compressed__isnull=False).iterator(chunk_size=200):
+        text = zlib.decompress(bytes(blob.compressed)).decode("utf-8")
+        KnowledgeBlob.objects.filter(pk=blob.pk).update(text=text, compressed=None)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("portfolio", "0020_knowledgesymbol"),
+    ]
+
+    operations = [
+        # The body column keeps its name ("content"); only the model field is renamed
+        migrations.SeparateDatabaseAndState(
+            state_operations=[
+                migrations.RenameField(model_name="knowledgeblob", old_name="content", new_name="text"),
+                migrations.AlterField(
+                    model_name="knowledgeblob",
+                    name="text",
+                    field=models.TextField(blank=True, db_column="content"),
+                ),
+            ],
+        ),
+        migrations.AddField(
+            model_name="knowledgeblob",
+            name="compressed",
+            field=models.BinaryField(editable=False, null=True),
+        ),
+        migrations.RunPython(compress_large_bodies, decompress_bodies),
+    ]
@@ -0,0 +1,17 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    # Existing bodies are summarized with `manage.py summarize_knowledge`.
+
+    dependencies = [
+        ("portfolio", "0021_knowledgeblob_compressed"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="knowledgeblob",
+            name="summary",
+            field=models.TextField(blank=True),
+        ),
+    ]
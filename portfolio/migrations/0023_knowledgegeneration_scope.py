@@ -0,0 +1,21 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("portfolio", "0022_knowledgeblob_summary"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="knowledgegeneration",
+            name="based_on",
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name="knowledgegeneration",
+            name="scope",
+            field=models.JSONField(blank=True, null=True),
+        ),
+    ]
@@ -4,6 +4,7 @@ from django.utils.module_loading import import_string
 from django.conf import settings
 from django.core.exceptions import ValidationError
 import uuid
+import zlib
 SupabaseMediaStorage = import_string('portfolio.storage_backends.SupabaseMediaStorage')
 
 class Profile(models.Model):
@@ -356,20 +357,145 @@ class BlogSubscription(models.Model):
         return f"Subscription: {self.email} ({'active' if self.active else 'inactive'})"
 
 
+class KnowledgeBlob(models.Model):
+    """Content-addressed body shared by every KnowledgeDocument with identical text.
+
+    Forks, templates and monorepo copies of a file store (and index) one body, while each
+    copy keeps its own KnowledgeDocument row as the source reference. Bodies of at least
+    KNOWLEDGE_COMPRESS_MIN_BYTES are stored zlib-compressed in `compressed` (with `text`
+    left empty); `content` hides the difference and decompresses on first access.
+    """
+    hash = models.CharField(max_length=64, primary_key=True)  # sha256 hex of content
+    text = models.TextField(blank=True, db_column="content")
+    compressed = models.BinaryField(null=True, editable=False)
+    # Short heuristic digest (portfolio.summaries) for the cheap tier of prompt packing
+    summary = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return self.hash[:12]
+
+    @property
+    def content(self) -> str:
+        if self.compressed is None:
+            return self.text
+        if getattr(self, "_decompressed", None) is None:
+            self._decompressed = zlib.decompress(bytes(self.compressed)).decode("utf-8")
+        return self._decompressed
+
+    @content.setter
+    def content(self, value: str) -> None:
+        value = value or ""
+        data = value.encode("utf-8")
+        if len(data) >= getattr(settings, "KNOWLEDGE_COMPRESS_MIN_BYTES", 4096):
+            self.text, self.compressed = "", zlib.compress(data, 6)
+        else:
+            self.text, self.compressed = value, None
+        self._decompressed = None
+
+
+class KnowledgeGeneration(models.Model):
+    """One complete version of the knowledge base.
+
+    Rebuilds and code ingests fill a new generation next to the live one, then flip readers
+    over by stamping `activated_at`: the most recently activated generation is the live one,
+    so switching (or rolling back) is a single-row update.
+    """
+    label = models.CharField(max_length=50, blank=True)  # refresh, ingest, initial, ...
+    building = models.BooleanField(default=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    activated_at = models.DateTimeField(null=True, blank=True, db_index=True)
+    # The live generation a build was seeded from, and the source prefixes the build owns
+    # (null: all of them). On first activation everything outside `scope` is re-taken from
+    # whatever is live by then, so concurrent builds don't undo each other.
+    based_on = models.PositiveIntegerField(null=True, blank=True)
+    scope = models.JSONField(null=True, blank=True)
+
+    class Meta:
+        ordering = ["-created_at", "-id"]
+
+    def __str__(self):
+        return f"{self.label or 'generation'} #{self.pk}"
+
+
+class KnowledgeSymbol(models.Model):
+    """Lowercased identifier defined in, or file path of, a code body (see portfolio.code_index)."""
+    DEFINITION = "definition"
+    PATH = "path"
+    KIND_CHOICES = [(DEFINITION, "Definition"), (PATH, "Path")]
+
+    blob = models.ForeignKey(KnowledgeBlob, on_delete=models.CASCADE, related_name="symbols", db_column="content_hash")
+    name = models.CharField(max_length=200)
+    kind = models.CharField(max_length=12, choices=KIND_CHOICES)
+
+    class Meta:
+        # Name-first, so exact lookups are a single index probe
+        constraints = [models.UniqueConstraint(fields=["name", "blob", "kind"], name="uniq_knowledge_symbol")]
+
+    def __str__(self):
+        return f"{self.kind}:{self.name}"
+
+
+# Kinds of knowledge source, taken from the `source` prefix ("project:3" -> "project")
+KNOWLEDGE_SOURCE_TYPES = ["profile", "project", "skill", "blog", "experience", "github_code"]
+
+
+def knowledge_source_type(source: str) -> str:
+    kind = (source or "").split(":", 1)[0]
+    return kind if kind in KNOWLEDGE_SOURCE_TYPES else ""
+
+
+class KnowledgeDocumentQuerySet(models.QuerySet):
+    def active(self):
+        """Documents of the live generation."""
+        from .generations import active_generation_id
+
+        return self.filter(generation_id=active_generation_id())
+
+
 class KnowledgeDocument(models.Model):
     """Simple text knowledge item built from site data."""
+    generation = models.ForeignKey(KnowledgeGeneration, on_delete=models.CASCADE, related_name="documents")
     source = models.CharField(max_length=100)  # e.g., profile, project:1, experience:2
+    # Stored at write time so per-kind counts don't need LIKE scans over `source`
+    source_type = models.CharField(max_length=20, blank=True, editable=False)
     title = models.CharField(max_length=200, blank=True)
-    content = models.TextField()
+    blob = models.ForeignKey(KnowledgeBlob, on_delete=models.PROTECT, related_name="documents", db_column="content_hash")
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    objects = KnowledgeDocumentQuerySet.as_manager()
+
     class Meta:
-        indexes = [models.Index(fields=["source"])]
+        indexes = [
+            models.Index(fields=["source"]),
+            models.Index(fields=["generation", "source"]),
+            models.Index(fields=["generation", "source_type"]),
+        ]
 
     def __str__(self):
         return f"{self.source}"
 
+    def save(self, *args, **kwargs):
+        self.source_type = knowledge_source_type(self.source)
+        super().save(*args, **kwargs)
+
+    @property
+    def content_hash(self) -> str:
+        return self.blob_id
+
+    @property
+    def header(self) -> str:
+        # Code bodies are shared across repos, so the per-source header is derived, not stored
+        if self.source.startswith("github_code:"):
+            repo, _, path = self.source[len("github_code:"):].partition(":")
+            return f"Repo: {repo}\nFile: {path}\n\n"
+        return ""
+
+    @property
+    def content(self) -> str:
+        return self.header + self.blob.content
+
 
 class ChatLog(models.Model):
     """Stores each chat interaction for auditing and analytics."""
@@ -0,0 +1,124 @@
+"""Default API pagination: page numbers, or keyset cursors on request.
+
+Page numbers cost a `COUNT(*)` plus an `OFFSET` scan that grows with depth. Cursor pages
+seek on the list's ordering instead, so page 500 costs the same as page one and no count
+is run. A client opts in with `?pagination=cursor` (then follows the `next`/`previous`
+links, which carry `?cursor=`); a view can make cursors its default with
+`pagination_mode = "cursor"`.
+"""
+import json
+
+from django.db.models import Q
+from rest_framework import pagination
+
+CURSOR_MODE = "cursor"
+
+
+class OrderedCursorPagination(pagination.CursorPagination):
+    """Cursor pages keyed on the list's existing ordering (`?ordering=`, queryset, Meta).
+
+    DRF positions a cursor on the first ordering field only and counts an offset through
+    runs of equal values. Here the ordering always ends in the pk, and the cursor position
+    holds every ordering field, so each page seeks with a row-value comparison and ties
+    never turn into offsets.
+    """
+
+    _position = None
+
+    def get_ordering(self, request, queryset, view):
+        self.ordering = list(queryset.query.order_by or queryset.model._meta.ordering or [])
+        # The filter's `?ordering=` replaces self.ordering inside super(), so the tiebreaker
+        # goes onto whatever it resolved to
+        return _with_tiebreaker(super().get_ordering(request, queryset, view))
+
+    def paginate_queryset(self, queryset, request, view=None):
+        cursor = super().decode_cursor(request)
+        self._position = cursor.position if cursor else None
+        if self._position is not None:
+            ordering = self.get_ordering(request, queryset, view)
+            queryset = queryset.filter(_seek(ordering, json.loads(self._position), cursor.reverse))
+        page = super().paginate_queryset(queryset, request, view)
+        # DRF only saw a position-less cursor (see decode_cursor): restore the links it implies
+        if self._position is not None:
+            if cursor.reverse:
+                self.has_next, self.next_position = True, self._position
+            else:
+                self.has_previous, self.previous_position = True, self._position
+        return page
+
+    def decode_cursor(self, request):
+        # The seek is applied above; DRF's own filter would compare the first field only
+        cursor = super().decode_cursor(request)
+        return cursor._replace(position=None) if cursor else None
+
+    def _get_position_from_instance(self, instance, ordering):
+        values = [getattr(instance, name.lstrip("-")) for name in ordering]
+        return json.dumps(values, default=str, separators=(",", ":"))
+
+
+def _with_tiebreaker(ordering):
+    ordering = list(ordering)
+    # A unique tiebreaker keeps rows with equal sort keys from being skipped or repeated, and
+    # lets the cursor seek past ties instead of counting an offset through them
+    if not any(name.lstrip("-") in ("id", "pk") for name in ordering):
+        descending = bool(ordering) and ordering[0].startswith("-")
+        ordering.append("-id" if descending else "id")
+    return tuple(ordering)
+
+
+def _seek(ordering, values, reverse: bool) -> Q:
+    """Rows strictly after `values` in `ordering` (before them when paging backwards)."""
+    condition, equal = Q(pk__in=[]), Q()
+    for name, value in zip(ordering, values):
+        field = name.lstrip("-")
+        after = name.startswith("-") == reverse  # ascending forwards, or descending backwards
+        if value is not None:
+            condition |= equal & Q(**{f"{field}__{'gt' if after else 'lt'}": value})
+            equal &= Q(**{field: value})
+        else:
+            equal &= Q(**{f"{field}__isnull": True})
+    return condition
+
+
+class PortfolioPagination(pagination.PageNumberPagination):
+    """Page-number pagination that hands over to `OrderedCursorPagination` when asked."""
+
+    mode_query_param = "pagination"
+    _cursor = None
+
+    def uses_cursor(self, request, view=None) -> bool:
+        if getattr(view, "pagination_mode", None) == CURSOR_MODE:
+            return True
+        params = request.query_params
+        return params.get(self.mode_query_param) == CURSOR_MODE or OrderedCursorPagination.cursor_query_param in params
+
+    def paginate_queryset(self, queryset, request, view=None):
+        if self.uses_cursor(request, view):
+            self._cursor = OrderedCursorPagination()
+            self._cursor.page_size = self.page_size
+            return self._cursor.paginate_queryset(queryset, request, view)
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        if self._cursor is not None:
+            return self._cursor.get_paginated_response(data)
+        return super().get_paginated_response(data)
+
+    def get_schema_operation_parameters(self, view):
+        params = super().get_schema_operation_parameters(view)
+        return params + [
+            {
+                "name": self.mode_query_param,
+                "required": False,
+                "in": "query",
+                "description": "`cursor` for keyset pagination (no count, constant cost per page).",
+                "schema": {"type": "string", "enum": [CURSOR_MODE]},
+            },
+            {
+                "name": OrderedCursorPagination.cursor_query_param,
+                "required": False,
+                "in": "query",
+                "description": "Cursor from a previous `next`/`previous` link.",
+                "schema": {"type": "string"},
+            },
+        ]
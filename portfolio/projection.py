@@ -0,0 +1,119 @@
+"""Projection of site content (profile, projects, skills, posts, experience) into knowledge documents.
+
+Each builder returns `(source, title, body)` ready for `knowledge.DocumentWriter.add`.
+`iter_documents()` projects everything with a fixed number of queries per content type.
+"""
+from typing import Iterator, Optional, Tuple
+
+from django.db.models import Prefetch
+
+from .models import BlogPost, Experience, Profile, Project, Skill
+
+Document = Tuple[str, str, str]
+
+# Models whose rows are projected into the knowledge base, by source prefix
+PROJECTED_MODELS = {
+    "profile": Profile,
+    "project": Project,
+    "skill": Skill,
+    "blog": BlogPost,
+    "experience": Experience,
+}
+# Fields that change without affecting any projected document (counters, derived media URLs)
+UNPROJECTED_FIELDS = {
+    "views_count", "likes_count", "bookmarks_count", "comments_count",
+    "avatar_url", "image_url", "cover_image_url", "company_logo_url",
+}
+
+
+def source_for(model, pk) -> Optional[str]:
+    for prefix, cls in PROJECTED_MODELS.items():
+        if model is cls:
+            return f"{prefix}:{pk}"
+    return None
+
+
+def profile_document(p: Profile) -> Document:
+    name = getattr(p.user, "get_full_name", lambda: "")() or (p.user.username if p.user else "")
+    content = (
+        f"Profile: {name}\nTitle: {p.title}\nTagline: {p.tagline}\nBio: {p.bio}\n"
+        f"Location: {p.location}\nWebsite: {p.website}\nPrimary Stack: {p.primary_stack}\n"
+        f"Years Experience: {p.years_experience}\nOpen To Opportunities: {p.open_to_opportunities}\n"
+        f"Highlights: {'; '.join(p.highlights or [])}\n"
+    )
+    return f"profile:{p.pk}", name or "profile", content
+
+
+def project_document(pr: Project) -> Document:
+    # .all() so a prefetched skill list is reused instead of one query per project
+    skills = ", ".join(s.name for s in pr.skills.all())
+    topics = ", ".join((pr.topics or []))
+    meta = (
+        f"Stars: {pr.stars} | Forks: {pr.forks} | Language: {pr.language} | "
+        f"Topics: {topics} | Last Pushed: {pr.last_pushed or ''}"
+    )
+    content = (
+        f"Project: {pr.title}\nDescription: {pr.description}\nSkills: {skills}\nFeatured: {pr.featured}\n"
+        f"Link: {pr.link}\nRepo: {pr.repo}\n{meta}\n"
+    )
+    return f"project:{pr.id}", pr.title, content
+
+
+def skill_document(s: Skill) -> Document:
+    content = (
+        f"Skill: {s.name}\nCategory: {s.category}\nPrimary: {s.primary}\n"
+        f"Since: {s.since_year or ''}\nDocs: {s.docs_url}\n"
+        f"Description: {s.description}\nHighlights: {'; '.join(s.highlights or [])}\n"
+    )
+    return f"skill:{s.id}", s.name, content
+
+
+def blog_document(b: BlogPost) -> Document:
+    tg = ", ".join(b.tags or [])
+    content = (
+        f"Blog: {b.title}\nSlug: {b.slug}\nSummary: {b.summary}\nTags: {tg}\n"
+        f"Reading: {b.reading_time} min\nContent: {b.content[:1500]}\n"
+    )
+    return f"blog:{b.id}", b.title, content
+
+
+def experience_document(e: Experience) -> Document:
+    content = f"Experience: {e.company}\nRole: {e.role}\nPeriod: {e.start_date} - {e.end_date or 'present'}\n{e.description}\n"
+    return f"experience:{e.id}", e.role, content
+
+
+BUILDERS = {
+    Profile: profile_document,
+    Project: project_document,
+    Skill: skill_document,
+    BlogPost: blog_document,
+    Experience: experience_document,
+}
+
+
+def document_for(instance) -> Optional[Document]:
+    builder = BUILDERS.get(type(instance))
+    return builder(instance) if builder else None
+
+
+# Rows fetched per chunk; prefetches run once per chunk rather than once per row
+CHUNK_SIZE = 500
+
+
+def projection_querysets():
+    """Querysets that load everything the builders read, keyed by model."""
+    return {
+        Profile: Profile.objects.select_related("user"),
+        Project: Project.objects.prefetch_related(Prefetch("skills", queryset=Skill.objects.only("id", "name"))),
+        Skill: Skill.objects.all(),
+        BlogPost: BlogPost.objects.all(),
+        Experience: Experience.objects.all(),
+    }
+
+
+def iter_documents() -> Iterator[Document]:
+    """Every site-derived document, in a stable order."""
+    for model, qs in projection_querysets().items():
+        builder = BUILDERS[model]
+        for obj in qs.order_by("pk").iterator(chunk_size=CHUNK_SIZE):
+            yield builder(obj)
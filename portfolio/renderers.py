@@ -0,0 +1,72 @@
+"""orjson-backed JSON renderer and parser for DRF, falling back to the stdlib versions.
+
+orjson encodes the large list payloads (projects with nested skills, blog listings, the
+homepage bundle) several times faster than `json`. When it is not installed, or meets a
+value it cannot encode natively, DRF's own implementation is used. Selected through
+REST_FRAMEWORK's renderer/parser settings (see API_FAST_JSON).
+"""
+from django.conf import settings
+from rest_framework import renderers
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.utils.encoders import JSONEncoder
+
+try:
+    import orjson
+except Exception:  # pragma: no cover
+    orjson = None
+
+# Datetimes go through _default so their format matches the stdlib renderer
+ORJSON_OPTIONS = (orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME) if orjson is not None else 0
+_encoder = JSONEncoder()
+
+
+def _default(obj):
+    # Decimals, datetimes, lazy translation strings, ... exactly as DRF's encoder renders them
+    return _encoder.default(obj)
+
+
+def _orjson_dumps(data):
+    try:
+        payload = orjson.dumps(data, default=_default, option=ORJSON_OPTIONS)
+    except TypeError:  # e.g. integers beyond 64 bits
+        return None
+    # DRF escapes the JavaScript line terminators U+2028/U+2029; orjson leaves them raw
+    if b"\xe2\x80\xa8" in payload or b"\xe2\x80\xa9" in payload:
+        payload = payload.replace(b"\xe2\x80\xa8", b"\\u2028").replace(b"\xe2\x80\xa9", b"\\u2029")
+    return payload
+
+
+def dumps(data) -> bytes:
+    """Compact UTF-8 JSON, with orjson when available."""
+    payload = _orjson_dumps(data) if orjson is not None else None
+    return payload if payload is not None else renderers.JSONRenderer().render(data)
+
+
+class FastJSONRenderer(renderers.JSONRenderer):
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+        # Indented output (`; indent=4` in Accept) is left to the stdlib renderer
+        if orjson is not None and not self.get_indent(accepted_media_type, renderer_context or {}):
+            payload = _orjson_dumps(data)
+            if payload is not None:
+                return payload
+        return super().render(data, accepted_media_type, renderer_context)
+
+
+class FastJSONParser(JSONParser):
+    renderer_class = FastJSONRenderer
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        if orjson is None:
+            return super().parse(stream, media_type, parser_context)
+        parser_context = parser_context or {}
+        encoding = parser_context.get("encoding", settings.DEFAULT_CHARSET)
+        raw = stream.read()
+        if encoding.lower().replace("-", "") != "utf8":
+            raw = raw.decode(encoding).encode("utf-8")
+        try:
+            return orjson.loads(raw)
+        except orjson.JSONDecodeError as exc:
+            raise ParseError(f"JSON parse error - {exc}")
@@ -0,0 +1,108 @@
+"""Cache of serialized rows, so list endpoints only serialize the rows that changed.
+
+Serializers opt in with `list_serializer_class = CachedListSerializer`. Entries are keyed by
+serializer, field selection (see SparseFieldsMixin), pk and the model's representation
+version. A write bumps the version of its model and of the models whose representations
+embed it (see portfolio.signals), which orphans the old entries rather than deleting them.
+Serializers with calendar-derived fields (`varies_by_date`) are also keyed by the day.
+Lookups go to a small in-process LRU first, then to the shared cache with one `get_many`.
+"""
+import datetime
+import hashlib
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import models
+from rest_framework import serializers
+
+try:
+    from cachetools import LRUCache
+except Exception:  # pragma: no cover
+    LRUCache = None
+
+_local = LRUCache(maxsize=getattr(settings, "REPRESENTATION_CACHE_LOCAL_SIZE", 2048)) if LRUCache else None
+_local_lock = threading.Lock()
+
+
+def version_key(model) -> str:
+    return f"representation_version:{model._meta.label_lower}"
+
+
+def representation_version(model) -> int:
+    key = version_key(model)
+    version = cache.get(key)
+    if version is None:
+        # Seeded from the clock so an evicted counter never reuses an old version
+        cache.add(key, time.time_ns(), timeout=None)
+        version = cache.get(key, 0)
+    return version
+
+
+def bump_versions(*models_) -> None:
+    for model in models_:
+        try:
+            cache.incr(version_key(model))
+        except ValueError:
+            cache.set(version_key(model), time.time_ns(), timeout=None)
+
+
+def _local_get_many(keys):
+    if _local is None:
+        return {}
+    with _local_lock:
+        return {key: _local[key] for key in keys if key in _local}
+
+
+def _local_set_many(entries) -> None:
+    if _local is not None and entries:
+        with _local_lock:
+            _local.update(entries)
+
+
+class CachedListSerializer(serializers.ListSerializer):
+    """Top-level `many=True` serialization through the representation cache.
+
+    Nested lists (e.g. a project's skills) are part of their parent's cached entry. The
+    version must be read before the rows are: a write committing in between then only
+    stores new rows under the old version, never old rows under the new one. Views that
+    evaluate the queryset early (pagination) pin it in the context as
+    `representation_versions` (see ConditionalGetMixin).
+    """
+
+    def to_representation(self, data):
+        if self.parent is not None or not getattr(settings, "REPRESENTATION_CACHE_ENABLED", True):
+            return super().to_representation(data)
+        prefix = self._key_prefix()
+        items = list(data.all() if isinstance(data, models.manager.BaseManager) else data)
+        keys = [f"{prefix}:{item.pk}" for item in items]
+        found = _local_get_many(keys)
+        missing = [key for key in keys if key not in found]
+        if missing:
+            shared = cache.get_many(missing)
+            _local_set_many(shared)
+            found.update(shared)
+        fresh = {}
+        for key, item in zip(keys, items):
+            if key not in found:
+                found[key] = fresh[key] = self.child.to_representation(item)
+        if fresh:
+            cache.set_many(fresh, timeout=getattr(settings, "REPRESENTATION_CACHE_TIMEOUT", 24 * 60 * 60))
+            _local_set_many(fresh)
+        return [found[key] for key in keys]
+
+    def _key_prefix(self) -> str:
+        # The field selection (and expansions) and, for absolute media URLs, the request host
+        shape = ",".join(f"{name}:{type(field).__name__}" for name, field in self.child.fields.items())
+        request = self.context.get("request")
+        if request is not None:
+            shape += "|" + request.build_absolute_uri("/")
+        if getattr(self.child, "varies_by_date", False):
+            shape += "|" + datetime.date.today().isoformat()
+        digest = hashlib.sha1(shape.encode("utf-8")).hexdigest()[:12]
+        model = self.child.Meta.model
+        version = self.context.get("representation_versions", {}).get(model)
+        if version is None:
+            version = representation_version(model)
+        return f"representation:{type(self.child).__name__}:{digest}:{version}"
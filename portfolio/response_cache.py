@@ -0,0 +1,70 @@
+"""Rendered-response cache for the public read endpoints.
+
+Entries are keyed by the content ETag (see portfolio.conditional), which already folds in
+the normalized query string, host, negotiated format and the per-model representation
+versions. Those versions act as invalidation tags: the signals that bump them on writes
+(portfolio.signals) make every cached page of the affected namespaces unreachable at once,
+so an admin edit is visible on the next request rather than after a TTL.
+"""
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpResponse
+from rest_framework.response import Response
+
+REPLAYED_HEADERS = ("ETag", "Last-Modified")
+
+
+def response_cache_key(etag: str) -> str:
+    return "response:" + etag.strip('"')
+
+
+class ResponseCacheMixin:
+    """Serve list/retrieve (`response_cache_actions`) from cached JSON bytes.
+
+    Place after ConditionalGetMixin, which supplies `content_etag`. Only JSON responses with
+    status 200 are stored; the browsable API renders per user and is never cached.
+    """
+
+    response_cache_actions = ("list", "retrieve")
+
+    def _response_cache_key(self, request, kwargs):
+        if not getattr(settings, "RESPONSE_CACHE_ENABLED", True) or self.action not in self.response_cache_actions:
+            return None
+        if getattr(request.accepted_renderer, "format", None) != "json":
+            return None
+        return response_cache_key(self.content_etag(request, **kwargs))
+
+    def _cached_response(self, request, kwargs, respond):
+        key = self._response_cache_key(request, kwargs)
+        entry = cache.get(key) if key else None
+        if entry is not None:
+            content, content_type, headers = entry
+            response = HttpResponse(content, content_type=content_type)
+            for name, value in headers.items():
+                response[name] = value
+            response["X-Response-Cache"] = "hit"
+            return response
+        self._store_response_as = key
+        return respond()
+
+    def list(self, request, *args, **kwargs):
+        return self._cached_response(request, kwargs, lambda: super(ResponseCacheMixin, self).list(request, *args, **kwargs))
+
+    def retrieve(self, request, *args, **kwargs):
+        return self._cached_response(
+            request, kwargs, lambda: super(ResponseCacheMixin, self).retrieve(request, *args, **kwargs)
+        )
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(request, response, *args, **kwargs)
+        key = getattr(self, "_store_response_as", None)
+        if key and isinstance(response, Response) and response.status_code == 200:
+            response.render()
+            headers = {name: response[name] for name in REPLAYED_HEADERS if response.has_header(name)}
+            cache.set(
+                key,
+                (response.content, response["Content-Type"], headers),
+                timeout=getattr(settings, "RESPONSE_CACHE_TIMEOUT", 60 * 60),
+            )
+            response["X-Response-Cache"] = "miss"
+        return response
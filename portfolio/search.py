@@ -0,0 +1,187 @@
+"""Full-text retrieval over knowledge bodies.
+
+Postgres keeps a `search_vector` tsvector column (GIN-indexed) on the blob table and ranks
+with `ts_rank`; SQLite keeps an FTS5 shadow table ranked with `bm25`. Both are created by
+migration 0019 outside the ORM and filled at write time by `index_blobs`. Databases with
+neither fall back to `icontains` matching. Code bodies are stored without their Repo/File
+header, so repository and file names are matched against document sources instead. Callers
+only use `search_documents`.
+"""
+import re
+from typing import Dict, List, Optional, Tuple
+
+from django.db import DatabaseError, connection, transaction
+from django.db.models import Q, QuerySet
+
+from .code_index import CODE_PREFIX, code_tokens, lookup_symbols
+from .models import KnowledgeBlob, KnowledgeDocument
+
+BLOB_TABLE = KnowledgeBlob._meta.db_table
+FTS_TABLE = "portfolio_knowledgeblob_fts"
+# Text search config: "simple" lowercases without stemming, which suits identifiers in code
+TS_CONFIG = "simple"
+MAX_TERMS = 8
+# Bodies per `UPDATE ... FROM (VALUES ...)` statement when filling search_vector
+INDEX_CHUNK = 500
+
+_fts_available: Optional[bool] = None
+
+
+def backend() -> str:
+    """"postgres", "fts5" or "like" for the default database."""
+    global _fts_available
+    if connection.vendor == "postgresql":
+        return "postgres"
+    if connection.vendor == "sqlite":
+        if _fts_available is None:
+            with connection.cursor() as cursor:
+                cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = %s", [FTS_TABLE])
+                _fts_available = cursor.fetchone() is not None
+        if _fts_available:
+            return "fts5"
+    return "like"
+
+
+def query_terms(text: str, limit: int = MAX_TERMS) -> List[str]:
+    """Distinct lowercase terms (three or more characters) of a question, in order.
+
+    Identifiers are split code-style (snake_case, camelCase, dotted, paths) so that
+    `getProjectCount` also matches bodies mentioning `get_project_count`.
+    """
+    terms: List[str] = []
+    for token in code_tokens(text):
+        # Only word characters reach the tsquery/FTS5 expressions
+        for term in re.findall(r"[a-z0-9_]+", token):
+            if len(term) > 2 and term not in terms:
+                terms.append(term)
+    return terms[:limit]
+
+
+def index_blobs(bodies: Dict[str, str]) -> None:
+    """Index newly stored bodies (hash -> text); call inside the transaction that stored them."""
+    if not bodies:
+        return
+    kind = backend()
+    rows = list(bodies.items())
+    with connection.cursor() as cursor:
+        if kind == "postgres":
+            # One statement per chunk rather than a round trip per body
+            for start in range(0, len(rows), INDEX_CHUNK):
+                chunk = rows[start:start + INDEX_CHUNK]
+                cursor.execute(
+                    f"UPDATE {BLOB_TABLE} AS b SET search_vector = to_tsvector('{TS_CONFIG}', v.body) "
+                    f"FROM (VALUES {', '.join(['(%s, %s)'] * len(chunk))}) AS v (hash, body) WHERE b.hash = v.hash",
+                    [value for digest, text in chunk for value in (digest, text)],
+                )
+        elif kind == "fts5":
+            cursor.executemany(
+                f"INSERT INTO {FTS_TABLE} (hash, content) SELECT %s, %s "
+                f"WHERE NOT EXISTS (SELECT 1 FROM {FTS_TABLE} WHERE hash = %s)",
+                [(digest, text, digest) for digest, text in rows],
+            )
+
+
+def prune_index() -> None:
+    """Drop FTS5 rows whose body was deleted (the Postgres column goes with its row)."""
+    if backend() == "fts5":
+        with connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {FTS_TABLE} WHERE hash NOT IN (SELECT hash FROM {BLOB_TABLE})")
+
+
+def _ranked_hashes(docs: QuerySet, terms: List[str], limit: int) -> List[str]:
+    # Candidate bodies are restricted to the documents in `docs` (generation, kind, ...)
+    scope_sql, scope_params = docs.values("blob_id").query.sql_with_params()
+    if backend() == "postgres":
+        tsquery = " | ".join(f"{t}:*" for t in terms)
+        sql = (
+            f"SELECT hash FROM {BLOB_TABLE} "
+            f"WHERE search_vector @@ to_tsquery('{TS_CONFIG}', %s) AND hash IN ({scope_sql}) "
+            f"ORDER BY ts_rank(search_vector, to_tsquery('{TS_CONFIG}', %s)) DESC LIMIT %s"
+        )
+        params = [tsquery, *scope_params, tsquery, limit]
+    else:
+        match = " OR ".join(f"{t}*" for t in terms)
+        sql = (
+            f"SELECT hash FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s AND hash IN ({scope_sql}) "
+            f"ORDER BY bm25({FTS_TABLE}) LIMIT %s"
+        )
+        params = [match, *scope_params, limit]
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        return [row[0] for row in cursor.fetchall()]
+
+
+def search_documents(docs: QuerySet, text: str, limit: int = 50) -> List[KnowledgeDocument]:
+    """Documents of `docs` matching the question, best match first.
+
+    Exact symbol or path hits (see portfolio.code_index) come first; full-text ranking
+    fills the rest, with code documents whose repository or path names more of the terms
+    ahead. Without usable terms this is simply the most recently updated documents.
+    """
+    exact = lookup_symbols(docs, text, limit)
+    terms = query_terms(text)
+    if not terms:
+        return _merge(exact, docs.order_by("-updated_at")[:limit], limit)
+    return _merge(exact, _rank_with_paths(_ranked_documents(docs, terms, limit), _path_matches(docs, terms, limit)), limit)
+
+
+def _ranked_documents(docs: QuerySet, terms: List[str], limit: int) -> List[KnowledgeDocument]:
+    if backend() == "like":
+        cond = Q()
+        for t in terms:
+            cond |= Q(blob__text__icontains=t)  # compressed bodies need one of the indexes above
+        return list(docs.filter(cond).order_by("-updated_at")[:limit])
+    try:
+        with transaction.atomic():  # savepoint, so a rejected query can't poison an outer transaction
+            hashes = _ranked_hashes(docs, terms, limit)
+    except DatabaseError:
+        # A query the index rejects degrades to recency rather than failing the chat request
+        return list(docs.order_by("-updated_at")[:limit])
+    rank = {digest: i for i, digest in enumerate(hashes)}
+    return sorted(docs.filter(blob_id__in=hashes), key=lambda d: rank[d.blob_id])
+
+
+def _path_matches(docs: QuerySet, terms: List[str], limit: int) -> List[Tuple[int, KnowledgeDocument]]:
+    """(terms named, document) for code documents whose repository or file path names terms."""
+    cond = Q()
+    for t in terms:
+        cond |= Q(source__icontains=t)
+    matches = []
+    for doc in docs.filter(source_type="github_code").filter(cond).order_by("-updated_at")[: limit * 4]:
+        # Whole path segments and identifier parts, so `work` doesn't hit `framework.js`
+        parts = set(code_tokens(doc.source[len(CODE_PREFIX):]))
+        named = sum(1 for t in terms if t in parts)
+        if named:
+            matches.append((named, doc))
+    return matches
+
+
+def _rank_with_paths(ranked: List[KnowledgeDocument], paths: List[Tuple[int, KnowledgeDocument]]):
+    position = {d.pk: i for i, d in enumerate(ranked)}
+    by_pk = {d.pk: d for d in ranked}
+    named = {}
+    for count, doc in paths:
+        by_pk.setdefault(doc.pk, doc)
+        named[doc.pk] = count
+    # Stable: full-text order within equal path scores, recency for path-only hits
+    return sorted(by_pk.values(), key=lambda d: (-named.get(d.pk, 0), position.get(d.pk, len(position))))
+
+
+def _merge(first: List[KnowledgeDocument], rest, limit: int) -> List[KnowledgeDocument]:
+    seen = {d.pk for d in first}
+    return (first + [d for d in rest if d.pk not in seen])[:limit]
+
+
+def rebuild_index(batch_size: int = 500) -> int:
+    """Re-index every stored body (after restoring a dump, or enabling FTS5 on an existing DB)."""
+    if backend() == "fts5":
+        with connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {FTS_TABLE}")
+    count, batch = 0, {}
+    for blob in KnowledgeBlob.objects.only("hash", "text", "compressed").iterator(chunk_size=batch_size):
+        batch[blob.hash] = blob.content
+        if len(batch) >= batch_size:
+            index_blobs(batch)
+            count, batch = count + len(batch), {}
+    index_blobs(batch)
+    return count + len(batch)
@@ -9,17 +9,46 @@ from .models import (
     BlogComment,
     BlogSubscription,
     KnowledgeDocument,
+    KnowledgeGeneration,
     ChatLog,
 )
 from django.contrib.auth import get_user_model
+from .representations import CachedListSerializer
 User = get_user_model()
 
-class SkillSerializer(serializers.ModelSerializer):
+
+class SparseFieldsMixin:
+    """Accepts `fields=` (names to keep) and `expand=` (relations to inline) at construction.
+
+    Unknown names are ignored. `expandable_fields` maps a relation to the serializer class
+    (or its name in this module) that renders it when expanded; otherwise it stays a pk.
+    """
+
+    expandable_fields = {}
+
+    def __init__(self, *args, fields=None, expand=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        expand = [name for name in (expand or ()) if name in self.expandable_fields]
+        for name in expand:
+            serializer_class = self.expandable_fields[name]
+            if isinstance(serializer_class, str):
+                serializer_class = globals()[serializer_class]
+            self.fields[name] = serializer_class(read_only=True)
+        if fields:
+            keep = set(fields) | set(expand)
+            for name in [n for n in self.fields if n not in keep]:
+                self.fields.pop(name)
+
+
+class SkillSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     years_used = serializers.SerializerMethodField()
     project_count = serializers.SerializerMethodField()
+    # years_used moves with the calendar: ETags and cached rows are per day (see conditional)
+    varies_by_date = True
 
     class Meta:
         model = Skill
+        list_serializer_class = CachedListSerializer
         fields = [
             "id",
             "name",
@@ -44,15 +73,21 @@ class SkillSerializer(serializers.ModelSerializer):
         return None
 
     def get_project_count(self, obj: Skill):
+        # Annotated by the querysets feeding this serializer (see SkillViewSet, ProjectViewSet)
+        count = getattr(obj, "project_count", None)
+        if count is not None:
+            return count
         from .models import Project  # local import to avoid circulars at import time
         return Project.objects.filter(skills=obj).count()
 
-class ProjectSerializer(serializers.ModelSerializer):
+class ProjectSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     skills = SkillSerializer(many=True, read_only=True)
     topics = serializers.ListField(child=serializers.CharField(), required=False)
+    varies_by_date = True  # nested skills' years_used
 
     class Meta:
         model = Project
+        list_serializer_class = CachedListSerializer
         fields = [
             "id",
             "title",
@@ -82,8 +117,9 @@ class ProjectSerializer(serializers.ModelSerializer):
             "has_ci",
         ]
 
-class ExperienceSerializer(serializers.ModelSerializer):
+class ExperienceSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     duration_months = serializers.SerializerMethodField()
+    varies_by_date = True  # duration_months of ongoing roles
 
     class Meta:
         model = Experience
@@ -121,7 +157,7 @@ class ExperienceSerializer(serializers.ModelSerializer):
             months += 1
         return max(0, months)
 
-class ProfileSerializer(serializers.ModelSerializer):
+class ProfileSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     name = serializers.SerializerMethodField()
     email = serializers.SerializerMethodField()
 
@@ -157,13 +193,47 @@ class ProfileSerializer(serializers.ModelSerializer):
             return obj.user.email
         return None
 
-class BlogPostSerializer(serializers.ModelSerializer):
+class BlogPostSerializer(SparseFieldsMixin, serializers.ModelSerializer):
+    expandable_fields = {"series": "BlogSeriesSerializer"}
+
     class Meta:
         model = BlogPost
+        list_serializer_class = CachedListSerializer
         fields = "__all__"
 
 
-class BlogSeriesSerializer(serializers.ModelSerializer):
+class BlogPostListSerializer(SparseFieldsMixin, serializers.ModelSerializer):
+    """Card fields for blog index pages; the body, TOC and SEO fields are only sent on retrieve."""
+
+    expandable_fields = {"series": "BlogSeriesSerializer"}
+
+    class Meta:
+        model = BlogPost
+        list_serializer_class = CachedListSerializer
+        fields = [
+            "id",
+            "title",
+            "slug",
+            "summary",
+            "excerpt",
+            "language",
+            "status",
+            "published_at",
+            "updated_at",
+            "reading_time",
+            "tags",
+            "views_count",
+            "likes_count",
+            "bookmarks_count",
+            "comments_count",
+            "featured",
+            "pinned_order",
+            "cover_image_url",
+            "series",
+        ]
+
+
+class BlogSeriesSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = BlogSeries
         fields = "__all__"
@@ -206,9 +276,24 @@ class ContactSerializer(serializers.Serializer):
 
 
 class KnowledgeDocumentSerializer(serializers.ModelSerializer):
+    content = serializers.CharField(read_only=True)
+    content_hash = serializers.CharField(read_only=True)
+
     class Meta:
         model = KnowledgeDocument
-        fields = "__all__"
+        fields = ["id", "source", "title", "content", "content_hash", "created_at", "updated_at"]
+
+
+class KnowledgeGenerationSerializer(serializers.ModelSerializer):
+    document_count = serializers.IntegerField(read_only=True)
+    active = serializers.SerializerMethodField()
+
+    class Meta:
+        model = KnowledgeGeneration
+        fields = ["id", "label", "building", "active", "document_count", "created_at", "activated_at"]
+
+    def get_active(self, obj) -> bool:
+        return obj.pk == self.context.get("active_id")
 
 
 class ChatLogSerializer(serializers.ModelSerializer):
@@ -236,9 +321,57 @@ class KnowledgeIngestRequestSerializer(serializers.Serializer):
     repos = serializers.ListField(child=serializers.CharField(), required=False)
     username = serializers.CharField(required=False, allow_blank=True)
     include_private = serializers.BooleanField(required=False, default=False)
+    # Dispatch one Celery task per repository and return a job id instead of ingesting inline
+    fanout = serializers.BooleanField(required=False, default=False)
+
+
+class GitHubRateLimitSerializer(serializers.Serializer):
+    limit = serializers.IntegerField(allow_null=True)
+    remaining = serializers.IntegerField(allow_null=True)
+    reset_at = serializers.IntegerField(allow_null=True, help_text="Epoch seconds when the budget resets")
+    retry_after = serializers.IntegerField(help_text="Seconds left on a secondary-limit Retry-After")
+    used = serializers.IntegerField(allow_null=True)
+    budget = serializers.IntegerField(allow_null=True)
+    waited_seconds = serializers.FloatField()
+
+
+class KnowledgeWriteStatsSerializer(serializers.Serializer):
+    rows = serializers.IntegerField()
+    created = serializers.IntegerField()
+    updated = serializers.IntegerField()
+    batches = serializers.IntegerField()
+    batch_size = serializers.IntegerField()
+    seconds = serializers.FloatField()
+    rows_per_sec = serializers.FloatField(allow_null=True)
 
 
 class KnowledgeIngestResponseSerializer(serializers.Serializer):
     ingested = KnowledgeDocumentSerializer(many=True)
     ingested_count = serializers.IntegerField()
-    skipped = serializers.IntegerField()
\ No newline at end of file
+    skipped = serializers.IntegerField()
+    # Files turned away by the content filters, by reason (too_large, binary, minified, generated, ...)
+    rejected = serializers.DictField(child=serializers.IntegerField())
+    # Repositories deferred until the rate limit resets (resumed in the background)
+    pending = serializers.ListField(child=serializers.CharField())
+    resume_at = serializers.DateTimeField(allow_null=True)
+    rate_limit = GitHubRateLimitSerializer()
+    write_stats = KnowledgeWriteStatsSerializer()
+
+
+class KnowledgeIngestJobSerializer(serializers.Serializer):
+    job_id = serializers.CharField()
+    status = serializers.ChoiceField(choices=[("running", "running"), ("done", "done")])
+    repos = serializers.IntegerField()
+    rate_limit_share = serializers.IntegerField(allow_null=True, required=False)
+    started_at = serializers.DateTimeField()
+    # Knowledge generation the job writes into; activated when the job finishes
+    generation = serializers.IntegerField(allow_null=True, required=False)
+    ingested_count = serializers.IntegerField(required=False)
+    skipped = serializers.IntegerField(required=False)
+    failures = serializers.ListField(child=serializers.CharField(), required=False)
+    rejected = serializers.DictField(child=serializers.IntegerField(), required=False)
+    pending = serializers.ListField(child=serializers.CharField(), required=False)
+    resume_at = serializers.DateTimeField(allow_null=True, required=False)
+    wall_seconds = serializers.FloatField(allow_null=True, required=False)
+    task_seconds = serializers.FloatField(required=False)
+    slowest = serializers.ListField(child=serializers.DictField(), required=False)
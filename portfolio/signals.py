@@ -0,0 +1,157 @@
+"""Keep projected knowledge documents in sync with site content as it is edited.
+
+Saves and deletes only enqueue work: after the transaction commits, the first event for a
+given object within KNOWLEDGE_SYNC_DEBOUNCE seconds schedules one Celery task, and further
+edits in that window ride along with it. The task re-reads the row and upserts (or removes)
+that object's single knowledge document.
+
+Cached row representations (portfolio.representations) are orphaned by bumping their
+model's version; then the cached homepage bundle (portfolio.bundle) is dropped and a
+debounced task renders it again.
+"""
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete
+from django.dispatch import receiver
+
+from .bundle import BUNDLE_CACHE_KEY, BUNDLE_REBUILD_KEY
+from .representations import bump_versions
+from .models import BlogPost, BlogSeries, Experience, Profile, Project, Skill
+from .projection import UNPROJECTED_FIELDS
+
+SYNCED_MODELS = (Profile, Project, Skill, BlogPost, Experience)
+
+
+def sync_cache_key(label: str, pk) -> str:
+    return f"knowledge_sync:{label}:{pk}"
+
+
+def enqueue_sync(model, pk) -> None:
+    if not getattr(settings, "KNOWLEDGE_SYNC_ENABLED", True):
+        return
+    label = model._meta.label
+    delay = getattr(settings, "KNOWLEDGE_SYNC_DEBOUNCE", 10)
+
+    def schedule():
+        from .tasks import sync_knowledge_source
+
+        # cache.add is atomic: only the first event of the debounce window schedules the task
+        if cache.add(sync_cache_key(label, pk), True, timeout=delay + 60):
+            sync_knowledge_source.apply_async(args=[label, pk], countdown=delay)
+
+    transaction.on_commit(schedule)
+
+
+@receiver(post_save, dispatch_uid="portfolio_knowledge_post_save")
+def knowledge_post_save(sender, instance, update_fields=None, raw=False, **kwargs):
+    if sender not in SYNCED_MODELS or raw:
+        return
+    # Counter bumps (likes, views) and media URL backfills don't change the document
+    if update_fields and set(update_fields) <= UNPROJECTED_FIELDS:
+        return
+    enqueue_sync(sender, instance.pk)
+
+
+@receiver(post_save, sender=get_user_model(), dispatch_uid="portfolio_knowledge_user_post_save")
+def knowledge_user_post_save(sender, instance, update_fields=None, raw=False, **kwargs):
+    # The profile document shows the user's full name
+    if raw or (update_fields and set(update_fields) <= {"last_login"}):
+        return
+    for profile_id in Profile.objects.filter(user=instance).values_list("id", flat=True):
+        enqueue_sync(Profile, profile_id)
+
+
+@receiver(pre_delete, sender=Skill, dispatch_uid="portfolio_knowledge_skill_pre_delete")
+def knowledge_skill_pre_delete(sender, instance, **kwargs):
+    # Project documents list skill names; the M2M rows vanish without m2m_changed on delete
+    for project_id in instance.project_set.values_list("id", flat=True):
+        enqueue_sync(Project, project_id)
+
+
+@receiver(post_delete, dispatch_uid="portfolio_knowledge_post_delete")
+def knowledge_post_delete(sender, instance, **kwargs):
+    if sender in SYNCED_MODELS:
+        enqueue_sync(sender, instance.pk)
+
+
+@receiver(m2m_changed, sender=Project.skills.through, dispatch_uid="portfolio_knowledge_project_skills")
+def knowledge_project_skills_changed(sender, instance, action, reverse, pk_set=None, **kwargs):
+    if not reverse:
+        if action in {"post_add", "post_remove", "post_clear"}:
+            enqueue_sync(Project, instance.pk)
+        return
+    # skill.project_set.<op>(...): the affected projects are in pk_set, or all of them on clear
+    if action in {"post_add", "post_remove"} and pk_set:
+        project_ids = pk_set
+    elif action == "pre_clear":
+        project_ids = list(instance.project_set.values_list("id", flat=True))
+    else:
+        return
+    for project_id in project_ids:
+        enqueue_sync(Project, project_id)
+
+
+# The bundle shows the profile's user name/email; counters and logins don't warrant a rebuild
+BUNDLE_MODELS = (Profile, Project, Skill, BlogPost, BlogSeries, Experience, get_user_model())
+BUNDLE_IGNORED_FIELDS = {"views_count", "likes_count", "bookmarks_count", "comments_count", "last_login"}
+
+
+def invalidate_content(model, bundle: bool = True) -> None:
+    """After commit, bump the representation versions `model` affects, then drop the bundle.
+
+    One callback, in that order: the bundle rebuild serializes through the row cache, so it
+    must not run while the old versions are still current.
+    """
+    delay = getattr(settings, "BUNDLE_REBUILD_DEBOUNCE", 5)
+
+    def apply():
+        from .tasks import rebuild_portfolio_bundle
+
+        # Readers take the version before the rows (CachedListSerializer), so bumping after
+        # commit never leaves old rows under the new version
+        if model in REPRESENTATION_DEPENDENTS:
+            bump_versions(*REPRESENTATION_DEPENDENTS[model])
+        if bundle and model in BUNDLE_MODELS:
+            cache.delete(BUNDLE_CACHE_KEY)
+            if cache.add(BUNDLE_REBUILD_KEY, True, timeout=delay + 60):
+                rebuild_portfolio_bundle.apply_async(countdown=delay)
+
+    transaction.on_commit(apply)
+
+
+# Representation versions (cached rows, ETags) to bump, keyed by the model written: projects
+# nest skills, skills count projects, posts can expand their series and profiles show the user
+REPRESENTATION_DEPENDENTS = {
+    Profile: (Profile,),
+    get_user_model(): (Profile,),
+    Project: (Project, Skill),
+    Skill: (Skill, Project),
+    Experience: (Experience,),
+    BlogPost: (BlogPost,),
+    BlogSeries: (BlogSeries, BlogPost),
+}
+CONTENT_MODELS = set(BUNDLE_MODELS) | set(REPRESENTATION_DEPENDENTS)
+
+
+@receiver(post_save, dispatch_uid="portfolio_content_post_save")
+def content_post_save(sender, raw=False, update_fields=None, **kwargs):
+    if sender not in CONTENT_MODELS or raw:
+        return
+    if update_fields and set(update_fields) <= {"last_login"}:
+        return
+    # Counters are shown by the list endpoints but not worth a bundle rebuild
+    invalidate_content(sender, bundle=not (update_fields and set(update_fields) <= BUNDLE_IGNORED_FIELDS))
+
+
+@receiver(post_delete, dispatch_uid="portfolio_content_post_delete")
+def content_post_delete(sender, **kwargs):
+    if sender in CONTENT_MODELS:
+        invalidate_content(sender)
+
+
+@receiver(m2m_changed, sender=Project.skills.through, dispatch_uid="portfolio_content_project_skills")
+def content_project_skills_changed(sender, action, **kwargs):
+    if action in {"post_add", "post_remove", "post_clear"}:
+        invalidate_content(Project)
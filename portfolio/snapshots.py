@@ -0,0 +1,177 @@
+"""Knowledge base snapshots: export the live generation to one compressed JSONL file and back.
+
+A snapshot holds one record per line, streamed in dependency order: a `meta` header, the
+`blob` bodies, their code `symbol` keys, then the `doc` rows. Import writes them with
+batched bulk inserts into a new generation and activates it, so a fresh environment is
+chat-ready without re-ingesting from GitHub. Full-text indexes are backend-specific and are
+rebuilt from the bodies while importing.
+
+Files ending in `.gz` are gzip-compressed; `.zst` uses zstandard when it is installed.
+"""
+import gzip
+import io
+import json
+from typing import Any, Dict, IO, Iterator, List
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from .generations import activate_generation, active_generation_id, begin_generation, discard_generation
+from .knowledge import blob_references, content_hash
+from .models import KnowledgeBlob, KnowledgeDocument, KnowledgeGeneration, KnowledgeSymbol, knowledge_source_type
+from .search import index_blobs
+
+try:
+    import zstandard
+except Exception:  # pragma: no cover
+    zstandard = None
+
+SNAPSHOT_VERSION = 1
+
+
+class SnapshotError(Exception):
+    """Snapshot file is unreadable, of an unknown version, or fails its integrity checks."""
+
+
+def open_snapshot(path: str, mode: str) -> IO[str]:
+    """Open a snapshot for text reading ("r") or writing ("w"), compressed by file extension."""
+    if path.endswith(".zst"):
+        if zstandard is None:
+            raise SnapshotError("zstandard is not installed; use a .gz snapshot")
+        if mode == "w":
+            raw = zstandard.ZstdCompressor(level=10).stream_writer(open(path, "wb"))
+        else:
+            raw = zstandard.ZstdDecompressor().stream_reader(open(path, "rb"))
+        return io.TextIOWrapper(raw, encoding="utf-8")
+    if path.endswith(".gz"):
+        return gzip.open(path, mode + "t", encoding="utf-8")
+    return open(path, mode, encoding="utf-8")
+
+
+def _records(batch_size: int) -> Iterator[Dict[str, Any]]:
+    generation_id = active_generation_id()
+    docs = KnowledgeDocument.objects.filter(generation_id=generation_id)
+    hashes = docs.values("blob_id")
+    yield {
+        "type": "meta",
+        "version": SNAPSHOT_VERSION,
+        "exported_at": timezone.now().isoformat(),
+        "generation": generation_id,
+        "documents": docs.count(),
+    }
+    blobs = KnowledgeBlob.objects.filter(hash__in=hashes).only("hash", "text", "compressed", "summary")
+    for blob in blobs.order_by("hash").iterator(chunk_size=batch_size):
+        yield {"type": "blob", "hash": blob.hash, "content": blob.content, "summary": blob.summary}
+    symbols = KnowledgeSymbol.objects.filter(blob_id__in=hashes).values_list("blob_id", "name", "kind")
+    for blob_id, name, kind in symbols.iterator(chunk_size=batch_size):
+        yield {"type": "symbol", "hash": blob_id, "name": name, "kind": kind}
+    for source, title, blob_id in docs.order_by("source").values_list("source", "title", "blob_id").iterator(
+        chunk_size=batch_size
+    ):
+        yield {"type": "doc", "source": source, "title": title, "hash": blob_id}
+
+
+def export_snapshot(path: str) -> Dict[str, int]:
+    """Stream the live generation to `path`; returns record counts by type."""
+    batch_size = getattr(settings, "KNOWLEDGE_WRITE_BATCH_SIZE", 500)
+    counts: Dict[str, int] = {}
+    with open_snapshot(path, "w") as fh:
+        for record in _records(batch_size):
+            fh.write(json.dumps(record, ensure_ascii=False, separators=(",", ":")) + "\n")
+            counts[record["type"]] = counts.get(record["type"], 0) + 1
+    counts.pop("meta", None)
+    return counts
+
+
+class _Loader:
+    """Batches snapshot records into bulk inserts for one target generation."""
+
+    def __init__(self, generation_id: int, batch_size: int, keep_alive=None):
+        self.generation_id = generation_id
+        self.batch_size = batch_size
+        self.keep_alive = keep_alive  # renews the blob lock registration (see blob_references)
+        self.blobs: List[KnowledgeBlob] = []
+        self.symbols: List[KnowledgeSymbol] = []
+        self.docs: List[KnowledgeDocument] = []
+        self.counts = {"blob": 0, "symbol": 0, "doc": 0}
+
+    def add(self, record: Dict[str, Any]) -> None:
+        kind = record.get("type")
+        if kind == "blob":
+            text = record["content"]
+            if content_hash(text) != record["hash"]:
+                raise SnapshotError(f"blob {record['hash'][:12]} does not match its hash")
+            blob = KnowledgeBlob(hash=record["hash"], summary=record.get("summary") or "")
+            blob.content = text
+            self.blobs.append(blob)
+        elif kind == "symbol":
+            self.flush_blobs()  # symbols reference blobs of earlier lines
+            self.symbols.append(KnowledgeSymbol(blob_id=record["hash"], name=record["name"], kind=record["kind"]))
+        elif kind == "doc":
+            self.flush_blobs()
+            self.flush_symbols()
+            source = record["source"]
+            self.docs.append(KnowledgeDocument(
+                generation_id=self.generation_id,
+                source=source,
+                source_type=knowledge_source_type(source),
+                title=record.get("title") or "",
+                blob_id=record["hash"],
+            ))
+        else:
+            return
+        self.counts[kind] += 1
+        if max(len(self.blobs), len(self.symbols), len(self.docs)) >= self.batch_size:
+            self.flush()
+
+    def flush_blobs(self) -> None:
+        if not self.blobs:
+            return
+        known = set(
+            KnowledgeBlob.objects.filter(hash__in=[b.hash for b in self.blobs]).values_list("hash", flat=True)
+        )
+        new = [b for b in self.blobs if b.hash not in known]
+        KnowledgeBlob.objects.bulk_create(new, ignore_conflicts=True)
+        index_blobs({b.hash: b.content for b in new})
+        self.blobs = []
+
+    def flush_symbols(self) -> None:
+        if self.symbols:
+            KnowledgeSymbol.objects.bulk_create(self.symbols, ignore_conflicts=True)
+            self.symbols = []
+
+    def flush(self) -> None:
+        if self.keep_alive is not None:
+            self.keep_alive()
+        self.flush_blobs()
+        self.flush_symbols()
+        if self.docs:
+            KnowledgeDocument.objects.bulk_create(self.docs)
+            self.docs = []
+
+
+def import_snapshot(path: str, activate: bool = True) -> Dict[str, Any]:
+    """Load a snapshot into a new generation (activated unless `activate=False`)."""
+    batch_size = getattr(settings, "KNOWLEDGE_WRITE_BATCH_SIZE", 500)
+    generation = begin_generation("import", carry_over=False)
+    loader = _Loader(generation.pk, batch_size)
+    try:
+        # Docs may reuse bodies already stored, which the orphan prune must leave alone
+        with open_snapshot(path, "r") as fh, blob_references() as loader.keep_alive, transaction.atomic():
+            header = json.loads(fh.readline() or "{}")
+            if header.get("type") != "meta" or header.get("version") != SNAPSHOT_VERSION:
+                raise SnapshotError("not a knowledge snapshot (or an unsupported version)")
+            for line in fh:
+                if line.strip():
+                    loader.add(json.loads(line))
+            loader.flush()
+    except Exception:
+        discard_generation(generation.pk)
+        raise
+    if activate:
+        activate_generation(generation.pk)
+    else:
+        # Left as a finished, inactive generation that can be activated later
+        KnowledgeGeneration.objects.filter(pk=generation.pk).update(building=False)
+    return {"generation": generation.pk, "activated": activate, **loader.counts}
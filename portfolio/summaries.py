@@ -0,0 +1,74 @@
+"""Cheap, deterministic summaries of knowledge bodies for the low tier of the context packer.
+
+Summaries are built once per body at write time from what the text already states:
+docstrings/leading comments and definition signatures for code, headings and the opening
+paragraph for Markdown, the first lines of anything else. They are stored on the blob, so
+identical files across repositories share one summary.
+"""
+import re
+from typing import List
+
+from .code_index import CODE_PREFIX, DEFINITION_RE
+
+SUMMARY_MAX_CHARS = 400
+MAX_SIGNATURES = 12
+MARKDOWN_EXT = {".md", ".txt", ".rst"}
+DOCSTRING_RE = re.compile(r'^\s*(?:[rubRUB]{0,2})("""|\'\'\')(?P<doc>.*?)\1', re.DOTALL)
+# A leading block of //, # or /* */ comments (licence headers and shebangs included)
+COMMENT_LINE_RE = re.compile(r"^\s*(?:#!|#|//|/\*+|\*/?|--)\s?(?P<text>.*)$")
+
+
+def _clip(text: str, limit: int = SUMMARY_MAX_CHARS) -> str:
+    text = text.strip()
+    if len(text) <= limit:
+        return text
+    cut = text.rfind("\n", 0, limit)
+    return (text[:cut] if cut > limit // 2 else text[:limit]).rstrip() + " …"
+
+
+def _first_paragraph(text: str) -> str:
+    for block in re.split(r"\n\s*\n", text.strip()):
+        if block.strip():
+            return " ".join(line.strip() for line in block.splitlines())
+    return ""
+
+
+def _leading_comment(text: str) -> str:
+    lines: List[str] = []
+    for line in text.lstrip().splitlines():
+        match = COMMENT_LINE_RE.match(line)
+        if not match:
+            break
+        if not line.lstrip().startswith("#!"):
+            lines.append(match.group("text").strip())
+    return _first_paragraph("\n".join(lines))
+
+
+def _line_at(text: str, start: int) -> str:
+    end = text.find("\n", start)
+    return text[start:end if end != -1 else len(text)].strip()[:120]
+
+
+def summarize_code(path: str, body: str) -> str:
+    ext = "." + path.rsplit(".", 1)[-1].lower() if "." in path else ""
+    if ext in MARKDOWN_EXT:
+        headings = [line.strip() for line in body.splitlines() if line.startswith("#")][:8]
+        prose = "\n".join(line for line in body.splitlines() if not line.startswith("#"))
+        return _clip("\n".join([*headings, _first_paragraph(prose)]))
+    docstring = DOCSTRING_RE.match(body)
+    intro = _first_paragraph(docstring.group("doc")) if docstring else _leading_comment(body)
+    signatures = [_line_at(body, m.start()) for m in DEFINITION_RE.finditer(body)][:MAX_SIGNATURES]
+    if not intro and not signatures:
+        return summarize_text(body)
+    return _clip("\n".join(filter(None, [intro, *signatures])))
+
+
+def summarize_text(body: str) -> str:
+    return _clip("\n".join(line for line in body.splitlines()[:12] if line.strip()))
+
+
+def summarize(source: str, body: str) -> str:
+    """Summary of one document body, chosen by the kind of source."""
+    if source.startswith(CODE_PREFIX):
+        return summarize_code(source[len(CODE_PREFIX):].partition(":")[2], body or "")
+    return summarize_text(body or "")
@@ -16,7 +16,181 @@ def send_contact_email(name: str, email: str, message: str) -> str:
     return f"sent:{datetime.utcnow().isoformat()}"
 
 
+REFRESH_STATS_CACHE_KEY = "knowledge_refresh:last"
+
+
+@shared_task
+def refresh_knowledge() -> dict:
+    """Nightly refresh: re-project site content and write only documents whose content changed."""
+    import logging
+    from django.core.cache import cache
+    from .generations import collect_generations
+    from .knowledge import sync_documents
+    from .projection import iter_documents
+
+    # Diffs are small row-level upserts, so they go straight into the live generation
+    stats = sync_documents(iter_documents())
+    stats["generations_collected"] = collect_generations()
+    stats["finished_at"] = datetime.utcnow().isoformat()
+    logging.getLogger(__name__).info(
+        "refresh_knowledge: %s created, %s updated, %s removed, %s unchanged in %ss",
+        stats["created"], stats["updated"], stats["removed"], stats["unchanged"], stats["seconds"],
+    )
+    cache.set(REFRESH_STATS_CACHE_KEY, stats, timeout=None)
+    return stats
+
+
+@shared_task
+def sync_knowledge_source(label: str, pk) -> str:
+    """Upsert or remove the knowledge document of one edited object (see portfolio.signals)."""
+    from django.apps import apps
+    from django.core.cache import cache
+    from .generations import live_generation_ids, touch_generation
+    from .knowledge import DocumentWriter, prune_orphan_blobs
+    from .models import KnowledgeDocument, Project, Skill
+    from .projection import document_for, source_for
+    from .signals import sync_cache_key
+
+    # Clear the debounce marker first so edits made while this runs schedule another pass
+    cache.delete(sync_cache_key(label, pk))
+    # Nothing to keep in sync until the first full refresh has built the site documents
+    if not KnowledgeDocument.objects.active().exclude(source__startswith="github_code:").exists():
+        return "skipped:not-built"
+    model = apps.get_model(label)
+    source = source_for(model, pk)
+    # Generations being built get the edit too, so it survives their switchover
+    generation_ids = live_generation_ids()
+    obj = model.objects.filter(pk=pk).first()
+    if obj is None:
+        KnowledgeDocument.objects.filter(generation_id__in=generation_ids, source=source).delete()
+        for generation_id in generation_ids:
+            touch_generation(generation_id)
+        prune_orphan_blobs()
+        return f"deleted:{source}"
+    documents = [document_for(obj)]
+    if model is Skill:
+        # Project documents list their skill names
+        documents += [document_for(project) for project in Project.objects.filter(skills=obj)]
+    written = updated = 0
+    for generation_id in generation_ids:
+        with DocumentWriter(upsert=True, generation_id=generation_id) as writer:
+            for document in documents:
+                writer.add(*document)
+        written += writer.created + writer.updated
+        updated += writer.updated
+    if updated:
+        prune_orphan_blobs()
+    return f"synced:{source}:{written}"
+
+
+@shared_task
+def rebuild_portfolio_bundle() -> int:
+    """Re-render the cached homepage bundle after content edits (see portfolio.signals)."""
+    from django.core.cache import cache
+    from .bundle import BUNDLE_REBUILD_KEY, rebuild_bundle
+
+    cache.delete(BUNDLE_REBUILD_KEY)
+    return rebuild_bundle()
+
+
+@shared_task
+def ingest_github_code(repos: list, generation_id: int = None) -> dict:
+    """Background code ingestion; re-schedules itself at the rate-limit reset when paused.
+
+    A paused run's generation stays `building` and the rescheduled run resumes into it, so
+    the build only goes live once every repository was processed.
+    """
+    from .github import GitHubClient, GitHubRateLimiter
+    from .ingest import ingest_repositories, resume_eta
+    from .models import KnowledgeGeneration
+
+    if generation_id and not KnowledgeGeneration.objects.filter(pk=generation_id, building=True).exists():
+        generation_id = None  # collected or already activated: start a fresh build
+    limiter = GitHubRateLimiter(max_wait=getattr(settings, "GITHUB_RATE_LIMIT_TASK_MAX_WAIT", 900))
+    result = ingest_repositories(GitHubClient(limiter=limiter), repos, generation_id=generation_id, activate=True)
+    eta = resume_eta(result["resume_at"])
+    if result["pending"] and eta and not getattr(settings, "CELERY_TASK_ALWAYS_EAGER", False):
+        ingest_github_code.apply_async(args=[result["pending"]], kwargs={"generation_id": result["generation"]}, eta=eta)
+    return {
+        "ingested_count": len(result["ingested"]),
+        "skipped": result["skipped"],
+        "rejected": result["rejected"],
+        "pending": result["pending"],
+        "resume_at": eta.isoformat() if eta else None,
+        "generation": result["generation"],
+        "rate_limit": result["rate_limit"],
+        "write_stats": result["write_stats"],
+    }
+
+
+@shared_task
+def ingest_github_repo(full_name: str, budget: int = None, generation_id: int = None) -> dict:
+    """Fan-out worker: ingest one repository within its share of the rate-limit budget."""
+    import time
+    from .github import GitHubClient, GitHubRateLimiter
+    from .ingest import ingest_repositories
+
+    started = time.perf_counter()
+    limiter = GitHubRateLimiter(max_wait=getattr(settings, "GITHUB_RATE_LIMIT_TASK_MAX_WAIT", 900), budget=budget)
+    result = ingest_repositories(GitHubClient(limiter=limiter), [full_name], prune=False, generation_id=generation_id)
+    return {
+        "repo": full_name,
+        "ingested_count": len(result["ingested"]),
+        "skipped": result["skipped"],
+        "rejected": result["rejected"],
+        "pending": result["pending"],
+        "resume_at": result["resume_at"],
+        "seconds": round(time.perf_counter() - started, 3),
+        "rate_limit": result["rate_limit"],
+    }
+
+
 @shared_task
-def refresh_knowledge() -> str:
-    # placeholder for later AI ingestion; succeeds to prove scheduling works
-    return f"refreshed:{datetime.utcnow().isoformat()}"
+def summarize_github_ingest(results: list, job_id: str, started_at: str, generation_id: int = None) -> dict:
+    """Chord callback: aggregate per-repo results into one job summary (cached for the status endpoint)."""
+    from collections import Counter
+    from django.core.cache import cache
+    from django.utils import timezone
+    from django.utils.dateparse import parse_datetime
+    from .generations import activate_generation, discard_generation
+    from .ingest import job_cache_key, resume_eta
+    from .knowledge import prune_orphan_blobs
+
+    rejected = Counter()
+    pending, failures = [], []
+    for r in results:
+        rejected.update(r.get("rejected") or {})
+        pending.extend(r.get("pending") or [])
+        if r.get("skipped"):
+            failures.append(r["repo"])
+    ingested_count = sum(r.get("ingested_count", 0) for r in results)
+    if generation_id and not pending:
+        # Flip chat over to the job's generation only if it actually ingested something
+        (activate_generation if ingested_count else discard_generation)(generation_id)
+    prune_orphan_blobs()
+    resume_at = max((r["resume_at"] for r in results if r.get("resume_at")), default=None)
+    eta = resume_eta(resume_at)
+    if pending and eta and not getattr(settings, "CELERY_TASK_ALWAYS_EAGER", False):
+        # The build stays unpublished; the resumed run finishes and activates it
+        ingest_github_code.apply_async(args=[pending], kwargs={"generation_id": generation_id}, eta=eta)
+    started = parse_datetime(started_at)
+    summary = {
+        "job_id": job_id,
+        "status": "done",
+        "repos": len(results),
+        "ingested_count": ingested_count,
+        "generation": generation_id,
+        "skipped": sum(r.get("skipped", 0) for r in results),
+        "failures": failures,
+        "rejected": dict(rejected),
+        "pending": pending,
+        "resume_at": eta.isoformat() if eta else None,
+        "started_at": started_at,
+        "wall_seconds": round((timezone.now() - started).total_seconds(), 3) if started else None,
+        # Sum of per-repo task time; wall_seconds well below this means the fan-out paid off
+        "task_seconds": round(sum(r.get("seconds", 0) for r in results), 3),
+        "slowest": sorted(({"repo": r["repo"], "seconds": r.get("seconds", 0)} for r in results),
+                          key=lambda x: -x["seconds"])[:5],
+    }
+    cache.set(job_cache_key(job_id), summary, timeout=24 * 60 * 60)
+    return summary
@@ -3,6 +3,7 @@ from rest_framework.permissions import AllowAny, IsAdminUser
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework.throttling import AnonRateThrottle, ScopedRateThrottle
+from drf_spectacular.types import OpenApiTypes
 from drf_spectacular.utils import extend_schema
 from django_filters.rest_framework import DjangoFilterBackend
 from .models import (
@@ -17,7 +18,9 @@ from .models import (
     BlogBookmark,
     BlogSubscription,
     KnowledgeDocument,
+    KnowledgeGeneration,
     ChatLog,
+    KNOWLEDGE_SOURCE_TYPES,
 )
 from .serializers import (
     ProfileSerializer,
@@ -25,30 +28,118 @@ from .serializers import (
     ExperienceSerializer,
     SkillSerializer,
     BlogPostSerializer,
+    BlogPostListSerializer,
     BlogSeriesSerializer,
     BlogCommentSerializer,
     BlogSubscriptionSerializer,
     ContactSerializer,
     KnowledgeDocumentSerializer,
+    KnowledgeGenerationSerializer,
     ChatLogSerializer,
     ChatAskSerializer,
     KnowledgeSourcesSerializer,
     KnowledgeIngestRequestSerializer,
     KnowledgeIngestResponseSerializer,
+    KnowledgeIngestJobSerializer,
+    GitHubRateLimitSerializer,
 )
-from .tasks import send_contact_email
-from django.db import transaction
+from .tasks import send_contact_email, ingest_github_code, refresh_knowledge
 from django.utils import timezone
 from .ai_providers import ask as ai_ask
+from .response_cache import ResponseCacheMixin
+from .bundle import get_bundle
+from .conditional import ConditionalGetMixin, make_etag, not_modified, request_fingerprint, set_validators
+from .github import GitHubClient, GitHubRateLimiter, RateLimitExhausted, rate_limit_status
+from .ingest import dispatch_fanout, ingest_repositories, job_cache_key, resume_eta
+from .generations import activate_generation, active_generation_id, generation_revision, rollback_generation
+from .knowledge import CHUNK_SEPARATOR, pack_documents, rebuild_generation
+from .projection import iter_documents
+from .search import search_documents
 from django.conf import settings
 import requests
 from django.http import HttpResponse
-import base64
-from django.db.models import Q
+import time
+from django.core.exceptions import FieldDoesNotExist
+from django.db.models import Count, OuterRef, Prefetch, Q, Subquery
+from django.db.models.functions import Coalesce
+
+# SkillSerializer.project_count reads this annotation instead of counting per skill. A
+# correlated subquery rather than Count("project"): inside the Project.skills prefetch a
+# join-based count would reuse the prefetch's own join and always yield 1.
+SKILLS_WITH_PROJECT_COUNT = Skill.objects.annotate(
+    project_count=Coalesce(
+        Subquery(
+            Project.skills.through.objects.filter(skill_id=OuterRef("pk"))
+            .values("skill_id")
+            .annotate(n=Count("project_id"))
+            .values("n")
+        ),
+        0,
+    )
+)
+
 
-class ProfileViewSet(viewsets.ModelViewSet):
-    queryset = Profile.objects.all()
+class SparseFieldsViewMixin:
+    """`?fields=a,b` and `?expand=rel` on reads, applied to both the serializer and the query.
+
+    Only the requested columns are loaded (`only()`), and joins/prefetches are kept only for
+    relations a requested field renders. `sparse_columns` maps serializer fields that are not
+    named after a model field to the model fields they read.
+    """
+
+    sparse_columns = {}
+    SPARSE_ACTIONS = ("list", "retrieve")
+
+    def _csv_param(self, name):
+        if getattr(self, "action", None) not in self.SPARSE_ACTIONS:
+            return []
+        raw = self.request.query_params.get(name) or ""
+        return [part.strip() for part in raw.split(",") if part.strip()]
+
+    def get_serializer(self, *args, **kwargs):
+        kwargs.setdefault("fields", self._csv_param("fields"))
+        kwargs.setdefault("expand", self._csv_param("expand"))
+        return super().get_serializer(*args, **kwargs)
+
+    def get_queryset(self):
+        qs = super().get_queryset()
+        expand = [n for n in self._csv_param("expand") if n in self.get_serializer_class().expandable_fields]
+        fields = self._csv_param("fields")
+        if fields:
+            qs = self._sparse_queryset(qs, set(fields) | set(expand))
+        if expand:
+            qs = qs.select_related(*expand)
+        return qs
+
+    def _sparse_queryset(self, qs, names):
+        opts = qs.model._meta
+        columns, relations = {opts.pk.name}, set()
+        for name in names:
+            for column in self.sparse_columns.get(name, [name]):
+                try:
+                    field = opts.get_field(column)
+                except FieldDoesNotExist:
+                    continue  # annotations and computed fields
+                if field.is_relation:
+                    relations.add(column)
+                if field.concrete and not field.many_to_many:
+                    columns.add(column)
+        joins = qs.query.select_related if isinstance(qs.query.select_related, dict) else {}
+        prefetches = [
+            lookup for lookup in qs._prefetch_related_lookups
+            if (getattr(lookup, "prefetch_through", lookup)).split("__")[0] in relations
+        ]
+        qs = qs.select_related(None).prefetch_related(None)
+        if any(name in relations for name in joins):
+            qs = qs.select_related(*[name for name in joins if name in relations])
+        return qs.prefetch_related(*prefetches).only(*columns)
+
+
+class ProfileViewSet(ConditionalGetMixin, ResponseCacheMixin, SparseFieldsViewMixin, viewsets.ModelViewSet):
+    # name/email come from the linked user; ordered so pagination is stable
+    queryset = Profile.objects.select_related("user").order_by("id")
     serializer_class = ProfileSerializer
+    sparse_columns = {"name": ["user"], "email": ["user"]}
     filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
     search_fields = ["title", "tagline", "location", "primary_stack"]
 
@@ -57,31 +148,33 @@ class ProfileViewSet(viewsets.ModelViewSet):
             return Response({"detail": "Profile already exists. Update it instead."}, status=status.HTTP_400_BAD_REQUEST)
         return super().create(request, *args, **kwargs)
 
-class ProjectViewSet(viewsets.ModelViewSet):
-    queryset = Project.objects.all()
+class ProjectViewSet(ConditionalGetMixin, ResponseCacheMixin, SparseFieldsViewMixin, viewsets.ModelViewSet):
+    queryset = Project.objects.prefetch_related(Prefetch("skills", queryset=SKILLS_WITH_PROJECT_COUNT))
     serializer_class = ProjectSerializer
     filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
     filterset_fields = ["featured", "skills__name"]
     search_fields = ["title", "description"]
     ordering_fields = ["created_at", "title", "id"]
 
-class ExperienceViewSet(viewsets.ModelViewSet):
+class ExperienceViewSet(ConditionalGetMixin, ResponseCacheMixin, SparseFieldsViewMixin, viewsets.ModelViewSet):
     queryset = Experience.objects.all()
     serializer_class = ExperienceSerializer
+    sparse_columns = {"duration_months": ["start_date", "end_date"]}
     filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
     search_fields = ["company", "role"]
     ordering_fields = ["start_date", "end_date", "id"]
 
-class SkillViewSet(viewsets.ModelViewSet):
-    queryset = Skill.objects.all()
+class SkillViewSet(ConditionalGetMixin, ResponseCacheMixin, SparseFieldsViewMixin, viewsets.ModelViewSet):
+    queryset = SKILLS_WITH_PROJECT_COUNT
     serializer_class = SkillSerializer
+    sparse_columns = {"years_used": ["since_year"]}
     filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
     search_fields = ["name", "description", "category"]
     filterset_fields = ["category", "primary"]
     ordering_fields = ["order", "name", "id"]
 
 
-class BlogSeriesViewSet(viewsets.ModelViewSet):
+class BlogSeriesViewSet(ConditionalGetMixin, ResponseCacheMixin, SparseFieldsViewMixin, viewsets.ModelViewSet):
     queryset = BlogSeries.objects.all()
     serializer_class = BlogSeriesSerializer
     filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
@@ -100,12 +193,32 @@ def _client_fingerprint(request):
     return hashlib.sha256(raw).hexdigest()
 
 
-class BlogPostViewSet(viewsets.ModelViewSet):
-    queryset = BlogPost.objects.all()
+# Columns list pages never render (see BlogPostListSerializer); still searchable, just not loaded
+BLOG_LIST_DEFERRED = ("content", "table_of_contents", "seo_title", "seo_description", "canonical_url", "og_image_url")
+
+
+class BlogPostViewSet(ConditionalGetMixin, ResponseCacheMixin, SparseFieldsViewMixin, viewsets.ModelViewSet):
+    queryset = BlogPost.objects.select_related("series")
     serializer_class = BlogPostSerializer
     filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
     search_fields = ["title", "slug", "summary", "content", "tags"]
     ordering_fields = ["published_at", "updated_at", "views_count", "likes_count", "id"]
+    last_modified_field = "updated_at"
+    # Detail responses stay uncached, and carry no validators, so the view counter they show
+    # is current (retrieve bumps it with a signal-less update that moves neither version nor stamp)
+    conditional_actions = ("list",)
+    response_cache_actions = ("list",)
+
+    def get_queryset(self):
+        qs = super().get_queryset()
+        if self.action in ("list", "related"):
+            qs = qs.defer(*BLOG_LIST_DEFERRED)
+        return qs
+
+    def get_serializer_class(self):
+        if self.action in ("list", "related"):
+            return BlogPostListSerializer
+        return super().get_serializer_class()
 
     def retrieve(self, request, *args, **kwargs):
         # Increment views atomically
@@ -156,7 +269,11 @@ class BlogPostViewSet(viewsets.ModelViewSet):
     def comments(self, request, pk=None):
         post = self.get_object()
         if request.method.lower() == "get":
-            qs = BlogComment.objects.filter(post=post, is_deleted=False, is_approved=True).order_by("created_at")
+            qs = BlogComment.objects.filter(post=post, is_deleted=False, is_approved=True).order_by("created_at", "id")
+            # Unpaginated unless the client asks for cursor pages (long threads)
+            if self.paginator is not None and self.paginator.uses_cursor(request):
+                page = self.paginator.paginate_queryset(qs, request, view=self)
+                return self.paginator.get_paginated_response(BlogCommentSerializer(page, many=True).data)
             return Response(BlogCommentSerializer(qs, many=True).data)
         # POST create
         if not post.allow_comments:
@@ -181,7 +298,7 @@ class BlogPostViewSet(viewsets.ModelViewSet):
     @action(detail=True, methods=["get"], permission_classes=[AllowAny])
     def related(self, request, pk=None):
         post = self.get_object()
-        qs = BlogPost.objects.exclude(pk=post.pk).filter(status="published")
+        qs = self.get_queryset().exclude(pk=post.pk).filter(status="published")
         # Boost same series first
         results = []
         if post.series_id:
@@ -189,20 +306,23 @@ class BlogPostViewSet(viewsets.ModelViewSet):
         # By tag overlap
         tags = set([t.lower() for t in (post.tags or [])])
         if tags:
+            # Score on tags alone, then load only the winners as full rows
             tagged = []
-            for cand in qs:
-                ctags = set([t.lower() for t in (cand.tags or [])])
-                if ctags & tags:
-                    tagged.append((len(ctags & tags), cand))
-            tagged.sort(key=lambda x: (-x[0], -x[1].published_at.timestamp() if x[1].published_at else 0))
-            results.extend([c for _, c in tagged[:6]])
+            for cand_id, ctags, published_at in qs.values_list("id", "tags", "published_at"):
+                overlap = len(set([t.lower() for t in (ctags or [])]) & tags)
+                if overlap:
+                    tagged.append((overlap, published_at.timestamp() if published_at else 0, cand_id))
+            tagged.sort(key=lambda x: (-x[0], -x[1]))
+            winners = [cand_id for _, _, cand_id in tagged[:6]]
+            by_id = qs.in_bulk(winners)
+            results.extend([by_id[cand_id] for cand_id in winners if cand_id in by_id])
         # Fallback recent
         if len(results) < 6:
             for cand in qs.order_by("-published_at")[:6]:
                 if cand not in results:
                     results.append(cand)
         results = results[:6]
-        return Response(BlogPostSerializer(results, many=True).data)
+        return Response(BlogPostListSerializer(results, many=True).data)
 
 
 class BlogSubscriptionView(APIView):
@@ -277,55 +397,24 @@ class ContactView(APIView):
 
 
 class KnowledgeRefreshView(APIView):
-    # Admin-only: rebuilds knowledge base from DB
+    # Admin-only: rebuilds site-derived knowledge from DB (edits are also synced incrementally via signals)
     permission_classes = [IsAdminUser]
 
     @extend_schema(request=None, responses={200: KnowledgeDocumentSerializer(many=True)})
     def post(self, request):
-        docs = []
-        with transaction.atomic():
-            KnowledgeDocument.objects.all().delete()
-            for p in Profile.objects.all():
-                name = getattr(p.user, "get_full_name", lambda: "")() or (p.user.username if p.user else "")
-                content = (
-                    f"Profile: {name}\nTitle: {p.title}\nTagline: {p.tagline}\nBio: {p.bio}\n"
-                    f"Location: {p.location}\nWebsite: {p.website}\nPrimary Stack: {p.primary_stack}\n"
-                    f"Years Experience: {p.years_experience}\nOpen To Opportunities: {p.open_to_opportunities}\n"
-                    f"Highlights: {'; '.join(p.highlights or [])}\n"
-                )
-                docs.append(KnowledgeDocument.objects.create(source="profile", title=name or "profile", content=content))
-            for pr in Project.objects.all():
-                skills = ", ".join(pr.skills.values_list("name", flat=True))
-                topics = ", ".join((pr.topics or []))
-                meta = (
-                    f"Stars: {pr.stars} | Forks: {pr.forks} | Language: {pr.language} | "
-                    f"Topics: {topics} | Last Pushed: {pr.last_pushed or ''}"
-                )
-                content = (
-                    f"Project: {pr.title}\nDescription: {pr.description}\nSkills: {skills}\nFeatured: {pr.featured}\n"
-                    f"Link: {pr.link}\nRepo: {pr.repo}\n{meta}\n"
-                )
-                docs.append(KnowledgeDocument.objects.create(source=f"project:{pr.id}", title=pr.title, content=content))
-            for s in Skill.objects.all():
-                content = (
-                    f"Skill: {s.name}\nCategory: {s.category}\nPrimary: {s.primary}\n"
-                    f"Since: {s.since_year or ''}\nDocs: {s.docs_url}\n"
-                    f"Description: {s.description}\nHighlights: {'; '.join(s.highlights or [])}\n"
-                )
-                docs.append(KnowledgeDocument.objects.create(source=f"skill:{s.id}", title=s.name, content=content))
-            for b in BlogPost.objects.all():
-                tg = ", ".join(b.tags or [])
-                content = (
-                    f"Blog: {b.title}\nSlug: {b.slug}\nSummary: {b.summary}\nTags: {tg}\n"
-                    f"Reading: {b.reading_time} min\nContent: {b.content[:1500]}\n"
-                )
-                docs.append(KnowledgeDocument.objects.create(source=f"blog:{b.id}", title=b.title, content=content))
-
-            # GitHub ingestion disabled here (metadata/README). We'll ingest code via a dedicated endpoint.
-            for e in Experience.objects.all():
-                content = f"Experience: {e.company}\nRole: {e.role}\nPeriod: {e.start_date} - {e.end_date or 'present'}\n{e.description}\n"
-                docs.append(KnowledgeDocument.objects.create(source=f"experience:{e.id}", title=e.role, content=content))
-        return Response(KnowledgeDocumentSerializer(docs, many=True).data)
+        # Built as a new generation next to the live one (chat keeps reading it), then switched over;
+        # only changed documents are rewritten and ingested github_code: documents are carried over
+        stats = rebuild_generation(iter_documents())
+        docs = (
+            KnowledgeDocument.objects.filter(generation_id=stats["generation"])
+            .exclude(source__startswith="github_code:")
+            .select_related("blob")
+        )
+        resp = Response(KnowledgeDocumentSerializer(docs, many=True).data)
+        resp["X-Write-Rows"] = str(stats["created"] + stats["updated"] + stats["removed"])
+        resp["X-Unchanged-Rows"] = str(stats["unchanged"])
+        resp["X-Knowledge-Generation"] = str(stats["generation"])
+        return resp
 
 
 class ChatAskView(APIView):
@@ -355,56 +444,27 @@ class ChatAskView(APIView):
             structured = False  # free-form so we can include fenced code blocks
 
         # Prioritize actual GitHub code chunks first, then projects, then other knowledge
-        if KnowledgeDocument.objects.exists():
-            from django.db.models import Q
-            code_qs = KnowledgeDocument.objects.filter(source__startswith="github_code:")
+        if KnowledgeDocument.objects.active().exists():
+            docs = KnowledgeDocument.objects.active().select_related("blob")
+            code_qs = docs.filter(source_type="github_code")
             if wants_code:
-                # Simple keyword-based filter to focus relevant files
-                terms = [w for w in q_lower.replace("/", " ").replace("\\", " ").split() if len(w) > 2]
-                cond = Q()
-                for t in terms[:8]:
-                    cond |= Q(content__icontains=t)
-                if cond:
-                    code_qs = code_qs.filter(cond)
-            code_chunks = list(code_qs.order_by("-updated_at").values_list("content", flat=True)[:50])
-
-            project_chunks = list(
-                KnowledgeDocument.objects.filter(source__startswith="project:").values_list("content", flat=True)
-            )
-            other_chunks = list(
-                KnowledgeDocument.objects.exclude(source__startswith="project:")
-                .exclude(source__startswith="github_code:")
-                .order_by("-updated_at")
-                .values_list("content", flat=True)
+                # Full-text ranked retrieval of the files relevant to the question
+                code_docs = search_documents(code_qs, question, limit=50)
+            else:
+                code_docs = list(code_qs.order_by("-updated_at")[:50])
+            project_docs = list(docs.filter(source_type="project"))
+            other_docs = list(docs.exclude(source_type__in=["project", "github_code"]).order_by("-updated_at"))
+            # Identical bodies (forks, copied files) are sent once
+            # within the context budget: full bodies for the top code hits, summaries for the rest
+            chunks = pack_documents(
+                code_docs + project_docs + other_docs,
+                budget=getattr(settings, "KNOWLEDGE_CONTEXT_BUDGET", 4000),
+                full_top=getattr(settings, "KNOWLEDGE_CONTEXT_FULL_TOP", 3) if wants_code else 0,
             )
-            chunks = code_chunks + project_chunks + other_chunks
-            knowledge = "\n---\n".join(chunks)
+            knowledge = CHUNK_SEPARATOR.join(chunks)
         else:
             # Fallback: assemble knowledge on the fly from DB if no cached docs exist
-            parts = []
-            for p in Profile.objects.all():
-                nm = getattr(p.user, "get_full_name", lambda: "")() or (p.user.username if p.user else "")
-                parts.append(
-                    f"Profile: {nm}\nTitle: {p.title}\nTagline: {p.tagline}\nBio: {p.bio}\nLocation: {p.location}\nWebsite: {p.website}\n"
-                )
-            for pr in Project.objects.all():
-                skills = ", ".join(pr.skills.values_list("name", flat=True))
-                topics = ", ".join((pr.topics or []))
-                meta = (
-                    f"Stars: {pr.stars} | Forks: {pr.forks} | Language: {pr.language} | "
-                    f"Topics: {topics} | Last Pushed: {pr.last_pushed or ''}"
-                )
-                parts.append(
-                    f"Project: {pr.title}\nDescription: {pr.description}\nSkills: {skills}\nFeatured: {pr.featured}\n"
-                    f"Link: {pr.link}\nRepo: {pr.repo}\n{meta}\n"
-                )
-            for s in Skill.objects.all():
-                parts.append(
-                    f"Skill: {s.name}\nCategory: {s.category}\nPrimary: {s.primary}\nSince: {s.since_year or ''}\n"
-                )
-            for b in BlogPost.objects.all():
-                parts.append(f"Blog: {b.title}\nSlug: {b.slug}\nSummary: {b.summary}\nContent: {b.content[:1500]}\n")
-            knowledge = "\n---\n".join(parts)
+            knowledge = CHUNK_SEPARATOR.join(body for _source, _title, body in iter_documents())
 
         started = timezone.now()
         log = ChatLog(provider=provider, model=model, question=question)
@@ -450,20 +510,48 @@ class KnowledgeSourcesView(APIView):
 
     @extend_schema(responses={200: KnowledgeSourcesSerializer})
     def get(self, request):
-        total = KnowledgeDocument.objects.count()
-        prefixes = ["profile", "project:", "skill:", "blog:", "experience:", "github_code:"]
-        counts = {}
-        for pfx in prefixes:
-            if pfx.endswith(":"):
-                counts[pfx] = KnowledgeDocument.objects.filter(source__startswith=pfx).count()
-            else:
-                counts[pfx] = KnowledgeDocument.objects.filter(source=pfx).count()
-        sample = list(
-            KnowledgeDocument.objects.filter(source__startswith="github_code:")
-            .order_by("-updated_at")
-            .values_list("title", flat=True)[:20]
-        )
-        return Response({"total": total, "counts": counts, "github_code_samples": sample})
+        from django.core.cache import cache
+
+        # Cached per generation revision, so any write to the live documents invalidates it
+        generation_id = active_generation_id()
+        revision = generation_revision(generation_id)
+        etag = make_etag("knowledge_sources", generation_id, revision, request_fingerprint(request))
+        cached = not_modified(request, etag=etag)
+        if cached is not None:
+            return cached
+        cache_key = f"knowledge_sources:{generation_id}:{revision}"
+        data = cache.get(cache_key)
+        if data is None:
+            docs = KnowledgeDocument.objects.filter(generation_id=generation_id)
+            # One conditional-aggregate query over the indexed source_type column
+            totals = docs.aggregate(
+                total=Count("id"),
+                **{kind: Count("id", filter=Q(source_type=kind)) for kind in KNOWLEDGE_SOURCE_TYPES},
+            )
+            # Response keys keep the historical prefix form ("project:", ...; "profile" is unsuffixed)
+            counts = {kind if kind == "profile" else f"{kind}:": totals[kind] for kind in KNOWLEDGE_SOURCE_TYPES}
+            sample = list(
+                docs.filter(source_type="github_code")
+                .order_by("-updated_at")
+                .values_list("title", flat=True)[:20]
+            )
+            data = {"total": totals["total"], "counts": counts, "github_code_samples": sample}
+            cache.set(cache_key, data, timeout=24 * 60 * 60)
+        return set_validators(Response(data), etag=etag)
+
+
+class PortfolioBundleView(APIView):
+    """Everything the homepage renders, served as cached pre-rendered JSON."""
+
+    permission_classes = [AllowAny]
+
+    @extend_schema(responses={200: OpenApiTypes.OBJECT})
+    def get(self, request):
+        payload, hit = get_bundle()
+        etag = make_etag("bundle", hashlib.sha1(payload).hexdigest())
+        resp = not_modified(request, etag=etag) or HttpResponse(payload, content_type="application/json")
+        resp["X-Bundle-Cache"] = "hit" if hit else "miss"
+        return set_validators(resp, etag=etag)
 
 
 class GitHubReposJSONView(APIView):
@@ -563,149 +651,139 @@ class KnowledgeIngestCodeView(APIView):
     @extend_schema(
         description="Ingest actual GitHub repo code into KnowledgeDocument."
         " Body: { repos: [\"owner/repo\"... ] | optional, username: string | optional, include_private: bool | optional }."
-        " If repos not provided, uses username (or include_private=1 to use authenticated user) to list repos.",
+        " If repos not provided, uses username (or include_private=1 to use authenticated user) to list repos."
+        " Requests are paced against the GitHub rate limit; when the budget runs out the remaining repos are"
+        " returned as `pending` and resumed in the background after `resume_at`."
+        " With fanout=true each repository is ingested by its own Celery task and the response is a job"
+        " (202) whose summary is available at /api/knowledge/ingest_code/jobs/{job_id}.",
         request=KnowledgeIngestRequestSerializer,
-        responses={200: KnowledgeIngestResponseSerializer},
+        responses={200: KnowledgeIngestResponseSerializer, 202: KnowledgeIngestJobSerializer},
     )
     def post(self, request):
         body = request.data or {}
         repos = body.get("repos") or []
         username = body.get("username")
         include_private = bool(body.get("include_private"))
-        gh_token = getattr(settings, "GITHUB_TOKEN", "")
-        headers = {
-            "Accept": "application/vnd.github+json",
-            "User-Agent": "portfolio-backend/1.0",
-            "X-GitHub-Api-Version": "2022-11-28",
-        }
-        if gh_token:
-            headers["Authorization"] = f"Bearer {gh_token}"
+        # Never sleep in a web worker: at the reserve (or on Retry-After) the limiter raises
+        # and the ingest pauses and resumes in Celery
+        client = GitHubClient(limiter=GitHubRateLimiter(max_wait=0))
         # If no explicit repos, resolve from username or authenticated user
         try:
             if not repos:
                 if include_private:
-                    if not gh_token:
+                    if not client.token:
                         return Response({"error": "GITHUB_TOKEN not configured; cannot fetch private repos."}, status=400)
-                    list_url = "https://api.github.com/user/repos?per_page=100&sort=updated&visibility=all&affiliation=owner"
+                    list_url = "/user/repos?per_page=100&sort=updated&visibility=all&affiliation=owner"
                 else:
                     if not username:
                         return Response({"error": "username required if include_private is false and repos not provided"}, status=400)
-                    list_url = f"https://api.github.com/users/{username}/repos?per_page=100&sort=updated"
-                seen = set()
-                while list_url and list_url not in seen:
-                    seen.add(list_url)
-                    lr = requests.get(list_url, headers=headers, timeout=20)
+                    list_url = f"/users/{username}/repos?per_page=100&sort=updated"
+                for lr in client.iter_pages(list_url):
                     if not lr.ok:
                         return Response({"error": "github list repos failed", "status": lr.status_code, "detail": lr.text[:300]}, status=502)
                     for repo in lr.json() or []:
                         full = repo.get("full_name")  # owner/name
                         if full:
                             repos.append(full)
-                    link = lr.headers.get("Link", "")
-                    next_url = None
-                    if link:
-                        for p in [p.strip() for p in link.split(",")]:
-                            if "rel=\"next\"" in p:
-                                raw = p.split(";")[0].strip()
-                                if raw.startswith("<") and raw.endswith(">"):
-                                    next_url = raw[1:-1]
-                                    break
-                    list_url = next_url
-                    if len(seen) >= 10:
-                        break
+        except RateLimitExhausted as e:
+            resp = Response(
+                {"error": "github rate limit exhausted", "resume_at": resume_eta(e.reset_at), "rate_limit": client.publish()},
+                status=429,
+            )
+            resp["Retry-After"] = str(max(1, int(e.reset_at - time.time())))
+            return resp
         except Exception as e:
             return Response({"error": f"repo discovery failed: {e}"}, status=500)
 
-        ingested = []
-        skipped = 0
-        # Filters
-        skip_dirs = {".git", "node_modules", "dist", "build", ".next", ".venv", "venv", ".cache", "__pycache__"}
-        # Common code/text extensions
-        include_ext = {
-            ".py", ".js", ".jsx", ".ts", ".tsx", ".json", ".yml", ".yaml", ".toml", ".ini", ".cfg",
-            ".css", ".scss", ".sass", ".html", ".md", ".txt", ".sql", ".sh", ".bat", ".ps1", ".rs", ".go",
-            ".java", ".kt", ".rb", ".php", ".c", ".h", ".cpp", ".hpp", ".cs"
-        }
-        # Per-file safety cap (bytes); set to None for unlimited. Use a large cap to avoid memory blow-ups.
-        max_blob_bytes = None
+        if bool(body.get("fanout")):
+            return Response(dispatch_fanout(repos), status=status.HTTP_202_ACCEPTED)
 
-        for full_name in repos:
-            try:
-                owner, repo = full_name.split("/", 1)
-            except ValueError:
-                continue
-            try:
-                # Get default branch
-                meta = requests.get(f"https://api.github.com/repos/{owner}/{repo}", headers=headers, timeout=20)
-                if not meta.ok:
-                    skipped += 1
-                    continue
-                default_branch = (meta.json() or {}).get("default_branch") or "main"
-                # Get tree (recursive)
-                tree_r = requests.get(
-                    f"https://api.github.com/repos/{owner}/{repo}/git/trees/{default_branch}?recursive=1",
-                    headers=headers,
-                    timeout=30,
-                )
-                if not tree_r.ok:
-                    skipped += 1
-                    continue
-                tree = (tree_r.json() or {}).get("tree") or []
-                for entry in tree:
-                    if entry.get("type") != "blob":
-                        continue
-                    path = entry.get("path") or ""
-                    # Skip unneeded directories
-                    parts = path.split("/")
-                    if any(p in skip_dirs for p in parts):
-                        continue
-                    # Extension filter
-                    ext = "." + path.rsplit(".", 1)[-1] if "." in path else ""
-                    if ext and ext.lower() not in include_ext:
-                        continue
-                    sha = entry.get("sha")
-                    if not sha:
-                        continue
-                    blob_r = requests.get(
-                        f"https://api.github.com/repos/{owner}/{repo}/git/blobs/{sha}",
-                        headers=headers,
-                        timeout=30,
-                    )
-                    if not blob_r.ok:
-                        continue
-                    blob = blob_r.json() or {}
-                    if blob.get("encoding") == "base64":
-                        raw = base64.b64decode(blob.get("content", ""))
-                    else:
-                        raw = (blob.get("content") or "").encode("utf-8", errors="ignore")
-                    if max_blob_bytes and len(raw) > max_blob_bytes:
-                        continue
-                    try:
-                        text = raw.decode("utf-8")
-                    except Exception:
-                        # Try latin-1 fallback
-                        try:
-                            text = raw.decode("latin-1")
-                        except Exception:
-                            continue
-                    header = f"Repo: {owner}/{repo}\nFile: {path}\n\n"
-                    doc = KnowledgeDocument.objects.create(
-                        source=f"github_code:{owner}/{repo}:{path}",
-                        title=f"{owner}/{repo}:{path}",
-                        content=header + text,
-                    )
-                    ingested.append(doc)
-            except Exception:
-                skipped += 1
-                continue
+        result = ingest_repositories(client, repos)
+        eta = resume_eta(result["resume_at"])
+        if result["pending"] and eta and not getattr(settings, "CELERY_TASK_ALWAYS_EAGER", False):
+            # Pause: pick the job back up right after the budget resets
+            ingest_github_code.apply_async(
+                args=[result["pending"]], kwargs={"generation_id": result["generation"]}, eta=eta
+            )
 
         return Response({
-            "ingested": KnowledgeDocumentSerializer(ingested, many=True).data,
-            "ingested_count": len(ingested),
-            "skipped": skipped,
+            "ingested": KnowledgeDocumentSerializer(result["ingested"], many=True).data,
+            "ingested_count": len(result["ingested"]),
+            "skipped": result["skipped"],
+            "rejected": result["rejected"],
+            "pending": result["pending"],
+            "resume_at": eta,
+            "rate_limit": result["rate_limit"],
+            "write_stats": result["write_stats"],
         })
 
 
+class KnowledgeIngestJobView(APIView):
+    """Admin-only: progress/summary of a fan-out ingestion job."""
+    permission_classes = [IsAdminUser]
+
+    @extend_schema(responses={200: KnowledgeIngestJobSerializer})
+    def get(self, request, job_id):
+        from django.core.cache import cache
+        job = cache.get(job_cache_key(job_id))
+        if not job:
+            return Response({"error": "not found"}, status=404)
+        return Response(job)
+
+
+class KnowledgeGenerationsView(APIView):
+    """Admin-only: knowledge generations, newest first, with the live one flagged."""
+    permission_classes = [IsAdminUser]
+
+    @extend_schema(responses={200: KnowledgeGenerationSerializer(many=True)})
+    def get(self, request):
+        generations = KnowledgeGeneration.objects.annotate(document_count=Count("documents"))[:20]
+        context = {"active_id": active_generation_id()}
+        return Response(KnowledgeGenerationSerializer(generations, many=True, context=context).data)
+
+
+class KnowledgeGenerationActivateView(APIView):
+    """Admin-only: switch chat over to a finished generation (e.g. to undo a bad ingest)."""
+    permission_classes = [IsAdminUser]
+
+    @extend_schema(request=None, responses={200: KnowledgeGenerationSerializer})
+    def post(self, request, generation_id):
+        generation = KnowledgeGeneration.objects.filter(pk=generation_id, building=False).first()
+        if generation is None:
+            return Response({"error": "generation not found or still building"}, status=404)
+        activate_generation(generation.pk)
+        generation.refresh_from_db()
+        return Response(KnowledgeGenerationSerializer(generation, context={"active_id": generation.pk}).data)
+
+
+class KnowledgeGenerationRollbackView(APIView):
+    """Admin-only: re-activate the generation that was live before the current one."""
+    permission_classes = [IsAdminUser]
+
+    @extend_schema(request=None, responses={200: KnowledgeGenerationSerializer})
+    def post(self, request):
+        generation = rollback_generation()
+        if generation is None:
+            return Response({"error": "no earlier generation to roll back to"}, status=409)
+        generation.refresh_from_db()
+        # Site documents are re-derived from the database; only ingested code stays rolled back
+        refresh_knowledge.delay()
+        return Response(KnowledgeGenerationSerializer(generation, context={"active_id": generation.pk}).data)
+
+
+class GitHubRateLimitView(APIView):
+    """Admin-only: remaining GitHub API budget as last seen by ingestion (or live with ?refresh=1)."""
+    permission_classes = [IsAdminUser]
+
+    @extend_schema(responses={200: GitHubRateLimitSerializer})
+    def get(self, request):
+        refresh = request.query_params.get("refresh") in {"1", "true", "True", "yes"}
+        try:
+            return Response(rate_limit_status(refresh=refresh))
+        except Exception as e:
+            return Response({"error": str(e)}, status=502)
+
+
 class GitHubIngestPinnedView(APIView):
     """Admin-only: fetch pinned GitHub repositories (via GraphQL) and upsert Projects.
 
@@ -186,6 +186,9 @@ MEDIA_ROOT = BASE_DIR / "media"
 DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 
 # Django REST Framework
+# orjson-backed JSON rendering/parsing for the API (stdlib json when orjson isn't installed)
+API_FAST_JSON = config("API_FAST_JSON", default=True, cast=bool)
+
 REST_FRAMEWORK = {
     "DEFAULT_AUTHENTICATION_CLASSES": (
         "rest_framework_simplejwt.authentication.JWTAuthentication",
@@ -193,7 +196,17 @@ REST_FRAMEWORK = {
     "DEFAULT_PERMISSION_CLASSES": (
         "portfolio.permissions.IsAdminOrReadOnly",
     ),
-    "DEFAULT_PAGINATION_CLASS": "rest_framework.pagination.PageNumberPagination",
+    "DEFAULT_RENDERER_CLASSES": (
+        "portfolio.renderers.FastJSONRenderer" if API_FAST_JSON else "rest_framework.renderers.JSONRenderer",
+        "rest_framework.renderers.BrowsableAPIRenderer",
+    ),
+    "DEFAULT_PARSER_CLASSES": (
+        "portfolio.renderers.FastJSONParser" if API_FAST_JSON else "rest_framework.parsers.JSONParser",
+        "rest_framework.parsers.FormParser",
+        "rest_framework.parsers.MultiPartParser",
+    ),
+    # Page numbers by default; ?pagination=cursor switches a list to keyset cursors
+    "DEFAULT_PAGINATION_CLASS": "portfolio.pagination.PortfolioPagination",
     "PAGE_SIZE": 10,
     "DEFAULT_SCHEMA_CLASS": "drf_spectacular.openapi.AutoSchema",
     "DEFAULT_FILTER_BACKENDS": (
@@ -420,6 +433,44 @@ DEFAULT_FROM_EMAIL = config("DEFAULT_FROM_EMAIL", default="no-reply@example.com"
 GOOGLE_API_KEY = config("GOOGLE_API_KEY", default="")
 GROQ_API_KEY = config("GROQ_API_KEY", default="")
 GITHUB_TOKEN = config("GITHUB_TOKEN", default="")
+# GitHub API pacing for ingestion (see portfolio.github.GitHubRateLimiter)
+# Calls kept in reserve for interactive use; ingestion pauses when only this many remain.
+GITHUB_RATE_LIMIT_RESERVE = config("GITHUB_RATE_LIMIT_RESERVE", default=50, cast=int)
+# Below this many remaining calls, requests are spread evenly until the reset.
+GITHUB_RATE_LIMIT_PACE_BELOW = config("GITHUB_RATE_LIMIT_PACE_BELOW", default=500, cast=int)
+# Longest a single call may block waiting for budget (seconds): ad-hoc clients vs Celery tasks.
+# The sync ingest endpoint never waits; it pauses the job and hands it to Celery instead.
+GITHUB_RATE_LIMIT_MAX_WAIT = config("GITHUB_RATE_LIMIT_MAX_WAIT", default=30, cast=int)
+GITHUB_RATE_LIMIT_TASK_MAX_WAIT = config("GITHUB_RATE_LIMIT_TASK_MAX_WAIT", default=900, cast=int)
+# Code ingestion content filters (see portfolio.content_filters)
+KNOWLEDGE_INGEST_MAX_BLOB_BYTES = config("KNOWLEDGE_INGEST_MAX_BLOB_BYTES", default=256 * 1024, cast=int)
+KNOWLEDGE_INGEST_SAMPLE_BYTES = config("KNOWLEDGE_INGEST_SAMPLE_BYTES", default=8 * 1024, cast=int)
+KNOWLEDGE_INGEST_MAX_AVG_LINE = config("KNOWLEDGE_INGEST_MAX_AVG_LINE", default=200, cast=int)
+# Rows per bulk insert/transaction when writing knowledge documents (tune for the pooler)
+KNOWLEDGE_WRITE_BATCH_SIZE = config("KNOWLEDGE_WRITE_BATCH_SIZE", default=500, cast=int)
+# Knowledge bodies at least this large (UTF-8 bytes) are stored zlib-compressed
+KNOWLEDGE_COMPRESS_MIN_BYTES = config("KNOWLEDGE_COMPRESS_MIN_BYTES", default=4096, cast=int)
+# Characters of knowledge context sent to the model per chat request, and how many top
+# code hits may use their full body (the rest, and all documents for broad questions, use summaries)
+KNOWLEDGE_CONTEXT_BUDGET = config("KNOWLEDGE_CONTEXT_BUDGET", default=4000, cast=int)
+KNOWLEDGE_CONTEXT_FULL_TOP = config("KNOWLEDGE_CONTEXT_FULL_TOP", default=3, cast=int)
+# Content edits re-project just the affected knowledge document via Celery, debounced (seconds)
+KNOWLEDGE_SYNC_ENABLED = config("KNOWLEDGE_SYNC_ENABLED", default=True, cast=bool)
+KNOWLEDGE_SYNC_DEBOUNCE = config("KNOWLEDGE_SYNC_DEBOUNCE", default=10, cast=int)
+# Knowledge generations kept (live one included) as rollback targets; older ones are collected nightly
+KNOWLEDGE_GENERATIONS_KEEP = config("KNOWLEDGE_GENERATIONS_KEEP", default=3, cast=int)
+# Homepage bundle (/api/bundle): featured posts included, and rebuild debounce (seconds) after edits
+BUNDLE_FEATURED_POSTS = config("BUNDLE_FEATURED_POSTS", default=6, cast=int)
+BUNDLE_REBUILD_DEBOUNCE = config("BUNDLE_REBUILD_DEBOUNCE", default=5, cast=int)
+# Lifetime of the cached bundle (seconds); bounds date-derived fields such as duration_months
+BUNDLE_CACHE_TIMEOUT = config("BUNDLE_CACHE_TIMEOUT", default=24 * 60 * 60, cast=int)
+# Serialized rows of projects, skills and posts are cached per version; entries kept in-process
+REPRESENTATION_CACHE_ENABLED = config("REPRESENTATION_CACHE_ENABLED", default=True, cast=bool)
+REPRESENTATION_CACHE_TIMEOUT = config("REPRESENTATION_CACHE_TIMEOUT", default=24 * 60 * 60, cast=int)
+REPRESENTATION_CACHE_LOCAL_SIZE = config("REPRESENTATION_CACHE_LOCAL_SIZE", default=2048, cast=int)
+# Rendered JSON of public list/detail GETs, keyed by content version (edits invalidate at once)
+RESPONSE_CACHE_ENABLED = config("RESPONSE_CACHE_ENABLED", default=True, cast=bool)
+RESPONSE_CACHE_TIMEOUT = config("RESPONSE_CACHE_TIMEOUT", default=60 * 60, cast=int)
 
 # Celery
 CELERY_BROKER_URL = config("CELERY_BROKER_URL", default=REDIS_URL)
@@ -52,10 +52,15 @@ urlpatterns = [
             }
         ),
     ),
+    path("api/bundle", portfolio_views.PortfolioBundleView.as_view(), name="portfolio-bundle"),
     path("api/contact", portfolio_views.ContactView.as_view(), name="contact"),
     path("api/knowledge/refresh", portfolio_views.KnowledgeRefreshView.as_view(), name="knowledge-refresh"),
     path("api/chat/ask", portfolio_views.ChatAskView.as_view(), name="chat-ask"),
     path("api/knowledge/ingest_code", portfolio_views.KnowledgeIngestCodeView.as_view(), name="knowledge-ingest-code"),
+    path("api/knowledge/ingest_code/jobs/<str:job_id>", portfolio_views.KnowledgeIngestJobView.as_view(), name="knowledge-ingest-job"),
+    path("api/knowledge/generations", portfolio_views.KnowledgeGenerationsView.as_view(), name="knowledge-generations"),
+    path("api/knowledge/generations/rollback", portfolio_views.KnowledgeGenerationRollbackView.as_view(), name="knowledge-generation-rollback"),
+    path("api/knowledge/generations/<int:generation_id>/activate", portfolio_views.KnowledgeGenerationActivateView.as_view(), name="knowledge-generation-activate"),
     path("api/knowledge/sources", portfolio_views.KnowledgeSourcesView.as_view(), name="knowledge-sources"),
     # Blog subscriptions
     path("api/blog/subscribe", portfolio_views.BlogSubscriptionView.as_view(), name="blog-subscribe"),
@@ -63,6 +68,7 @@ urlpatterns = [
     path("api/blog/unsubscribe", portfolio_views.BlogSubscriptionUnsubscribeView.as_view(), name="blog-unsubscribe"),
     path("api/github/repos.json", portfolio_views.GitHubReposJSONView.as_view(), name="github-repos-json"),
     path("test/github-repos", portfolio_views.GitHubReposHTMLView.as_view(), name="github-repos-html"),
+    path("api/github/rate_limit", portfolio_views.GitHubRateLimitView.as_view(), name="github-rate-limit"),
     path("api/github/ingest_pinned", portfolio_views.GitHubIngestPinnedView.as_view(), name="github-ingest-pinned"),
     path("api/auth/jwt/create", TokenObtainPairView.as_view(), name="jwt-create"),
     path("api/auth/jwt/refresh", TokenRefreshView.as_view(), name="jwt-refresh"),